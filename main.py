@@ -8,49 +8,75 @@ manages the application's configuration, and runs the main processing loop.
 """
 
 import os
+import re
+import unicodedata
 import json
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache, partial
+import numpy as np
 from PIL import Image
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Final, Optional, Union
 
 # Import factory functions and interfaces from the source directory
 from src.asr import get_asr_model, ASRInterface
-from src.vlm import get_vlm_service, VLMInterface
-from src.tts import speak
+from src.vlm import get_vlm_service, VLMInterface, encode_jpeg, prepare_image, DEFAULT_MAX_SIDE
+from src.tts import speak, speak_stream
 from src.audio_recorder import AudioRecorder
+from src.streaming_asr import StreamingTranscriber
+from src.speculative_vlm import SpeculativeDecision
 
-class AppConfig:
-    """
-    Centralized configuration for the application.
+# Matches the outermost JSON object in a VLM response that may be wrapped in
+# explanatory text. Compiled once instead of on every interaction.
+_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
 
-    This class holds all the configurable parameters, making it easy to
-    manage and modify the application's behavior without changing the core logic.
-    """
-    # --- Service Selection ---
-    # Switch between 'whisper' (real) and 'funasr' (mock)
-    ASR_SERVICE: str = "whisper"
-    # Switch between 'gemini' (real) and 'qwen_vl' (mock)
-    VLM_SERVICE: str = "gemini"
+# Response schema for the VLM decision. Backends with a JSON mode (Gemini)
+# are constrained to it, so their output can be decoded directly. Field
+# comments mirror the three formats described in the prompt template.
+_DECISION_SCHEMA: Dict[str, Any] = {
+    "type": "OBJECT",
+    "properties": {
+        "action": {"type": "STRING", "format": "enum", "enum": ["shutdown", "pick_up", "clarify"]},
+        # shutdown
+        "confirmation_needed": {"type": "BOOLEAN"},
+        "message": {"type": "STRING"},
+        # pick_up
+        "target_description": {"type": "STRING"},
+        # clarify
+        "question": {"type": "STRING"},
+    },
+    "required": ["action"],
+}
 
-    # --- Model & Path Configuration ---
-    # Specific model name for Whisper ASR
-    WHISPER_MODEL: str = "base"
-    # Recording mode: 'file' for test files, 'microphone' for live recording
-    RECORDING_MODE: str = "microphone"  # Change to "file" to use test files
-    # Path to the test audio file (used when RECORDING_MODE is 'file')
-    TEST_AUDIO_FILE: str = "test_data/test_audio.wav"
-    # Path to the test image file (replace with a real camera capture function)
-    TEST_IMAGE_FILE: str = "test_data/test_image_01.jpeg"
+# Words accepted as a yes/no answer to the shutdown confirmation prompt
+_POSITIVE_REPLY_RE = re.compile("|".join(map(re.escape, ["是", "對", "確定", "關閉", "好", "yes", "confirm", "確認"])))
+_NEGATIVE_REPLY_RE = re.compile("|".join(map(re.escape, ["否", "不", "取消", "繼續", "no", "cancel", "不要"])))
 
-    # --- VLM Prompt Template ---
-    # This is the master prompt that defines the VLM's persona, tasks, and
-    # output format. Its quality is critical to the system's performance.
-    VLM_PROMPT_TEMPLATE: str = """
+# LRU cache of parsed VLM decisions keyed by (image hash, instruction hash).
+# On an assembly line the same scene and instruction recur constantly, and a
+# hit skips the VLM round trip entirely.
+_DECISION_CACHE_MAX_ENTRIES = 128
+_DECISION_CACHE: "OrderedDict[tuple[str, str], Dict[str, Any]]" = OrderedDict()
+
+# Longest time the interaction loop waits for a VLM decision before telling
+# the operator and moving on, so a stuck request never freezes the robot.
+_VLM_TIMEOUT_SECONDS = 30.0
+
+# The most recently prepared scene image (as JPEG bytes), keyed by (path,
+# mtime, size, max side). Consecutive turns usually see the same scene, so the
+# image is only decoded, resized and encoded again when the file changes.
+_LAST_SCENE_IMAGE: Optional[tuple[tuple[str, int, int, int], bytes]] = None
+
+# --- VLM Prompt Template ---
+# This is the master prompt that defines the VLM's persona, tasks, and
+# output format. Its quality is critical to the system's performance.
+# The operator's instruction is placed last so every request starts with the
+# same static text, which Gemini's implicit prompt caching can reuse.
+_VLM_PROMPT_TEMPLATE: Final[str] = """
 # 角色
 您是一位高精度、安全優先的智慧生產線機械手臂助理。您透過攝影機觀察生產線。請根據下方即時影像和操作員的指令做出決策。
 
-# 操作員指令
-"{user_instruction_text}"
-
 # 您的任務
 1.  **視覺分析**：仔細觀察影像中的所有物件，特別是不同長度和孔距的鋁型材、螺絲、工具和材料架。
 2.  **定位**：將操作員指令中的詞語（例如「那個長的」、「左邊那個」、「那一個」）與影像中的特定物件連結。
@@ -72,13 +98,93 @@ class AppConfig:
 {{"action": "clarify", "question": "您是指我面前那個長的零件，綠色盒子旁邊的那個嗎？"}}
 
 # 請用繁體中文回應
+
+# 操作員指令
+"{user_instruction_text}"
+
 # 開始分析：
 """
 
+class AppConfig:
+    """
+    Centralized configuration for the application.
+
+    This class holds all the configurable parameters, making it easy to
+    manage and modify the application's behavior without changing the core logic.
+    """
+    # --- Service Selection ---
+    # Switch between 'faster_whisper' (real, INT8), 'whisper' (real) and 'funasr' (mock)
+    ASR_SERVICE: str = "faster_whisper"
+    # Switch between 'gemini' (real) and 'qwen_vl' (mock)
+    VLM_SERVICE: str = "gemini"
+
+    # Run a throwaway ASR and VLM inference at startup so the first user
+    # command does not pay cold-start costs
+    WARM_UP_SERVICES: bool = True
+
+    # --- Model & Path Configuration ---
+    # Specific model name for Whisper ASR (used by both Whisper backends)
+    WHISPER_MODEL: str = "base"
+    # Smaller Whisper model used only to transcribe the short yes/no reply to the
+    # shutdown confirmation. Set to None to reuse the main ASR model instead.
+    CONFIRM_ASR_MODEL: Optional[str] = "tiny"
+    # Recording mode: 'file' for test files, 'microphone' for live recording
+    RECORDING_MODE: str = "microphone"  # Change to "file" to use test files
+    # In microphone mode, transcribe completed segments while still recording
+    STREAMING_ASR: bool = True
+    # With streaming ASR, query the VLM with the partial transcript before the
+    # user has finished speaking, and reuse the answer only if the final text
+    # is the same instruction
+    SPECULATIVE_VLM: bool = True
+    # Path to the test audio file (used when RECORDING_MODE is 'file')
+    TEST_AUDIO_FILE: str = "test_data/test_audio.wav"
+    # Path to the test image file (replace with a real camera capture function)
+    TEST_IMAGE_FILE: str = "test_data/test_image_01.jpeg"
+    # Longest side (in pixels) of the image sent to the VLM; the same limit
+    # the VLM services apply to PIL images (see `prepare_image`).
+    VLM_MAX_IMAGE_SIDE: int = DEFAULT_MAX_SIDE
+
+    # --- VLM Prompt Template ---
+    # See `_VLM_PROMPT_TEMPLATE`; kept here so callers can override it per config.
+    VLM_PROMPT_TEMPLATE: str = _VLM_PROMPT_TEMPLATE
+
+@lru_cache(maxsize=None)
+def _split_prompt_template(prompt_template: str) -> tuple[str, str]:
+    """
+    Splits a prompt template around its `{user_instruction_text}` placeholder.
+
+    The halves are cached per template, so building the final prompt is a
+    plain concatenation instead of a full `str.format` pass over the template.
+    Escaped braces (`{{` / `}}`) are unescaped here, exactly as `str.format`
+    would have done.
+
+    Args:
+        prompt_template (str): The master prompt containing one
+                               `{user_instruction_text}` placeholder.
+
+    Returns:
+        A tuple of the (prefix, suffix) surrounding the placeholder.
+    """
+    prefix, suffix = prompt_template.split("{user_instruction_text}")
+    prefix = prefix.replace("{{", "{").replace("}}", "}")
+    suffix = suffix.replace("{{", "{").replace("}}", "}")
+    return prefix, suffix
+
+def _build_prompt(prompt_template: str, instruction_text: str) -> str:
+    """
+    Builds the final VLM prompt for an instruction from the cached template halves.
+    """
+    prompt_prefix, prompt_suffix = _split_prompt_template(prompt_template)
+    return prompt_prefix + instruction_text + prompt_suffix
+
 def initialize_services(config: AppConfig) -> tuple[ASRInterface, VLMInterface]:
     """
     Initializes and returns the required services based on the configuration.
 
+    The ASR model load (several seconds for Whisper) runs on a background
+    thread while the VLM service is created, so start-up takes as long as the
+    slower of the two rather than their sum.
+
     Args:
         config (AppConfig): The application configuration object.
 
@@ -90,9 +196,11 @@ def initialize_services(config: AppConfig) -> tuple[ASRInterface, VLMInterface]:
     """
     print("--- Initializing Services ---")
     try:
-        asr_service = get_asr_model(config.ASR_SERVICE, model_name=config.WHISPER_MODEL)
-        # Use the latest Gemini 2.5 Flash model for better performance
-        vlm_service = get_vlm_service(config.VLM_SERVICE, model_name="gemini-2.5-flash")
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="asr-load") as executor:
+            asr_future = executor.submit(get_asr_model, config.ASR_SERVICE, model_name=config.WHISPER_MODEL)
+            # Use the latest Gemini 2.5 Flash model for better performance
+            vlm_service = get_vlm_service(config.VLM_SERVICE, model_name="gemini-2.5-flash")
+            asr_service = asr_future.result()
         print("--- Services Initialized Successfully ---\n")
         return asr_service, vlm_service
     except Exception as e:
@@ -101,37 +209,66 @@ def initialize_services(config: AppConfig) -> tuple[ASRInterface, VLMInterface]:
         print("Please check your configuration, dependencies, and API keys.")
         raise SystemExit(1)
 
-def handle_shutdown_confirmation() -> bool:
+def warm_up_services(asr: ASRInterface, vlm: VLMInterface) -> None:
+    """
+    Warms up the ASR and VLM services concurrently.
+
+    Failures are reported but not fatal: the services still work, the first
+    real request is just slower.
+
+    Args:
+        asr (ASRInterface): The initialized ASR service.
+        vlm (VLMInterface): The initialized VLM service.
+    """
+    print("--- Warming Up Services ---")
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="warm-up") as executor:
+        warm_ups = {"ASR": executor.submit(asr.warm_up), "VLM": executor.submit(vlm.warm_up)}
+        for name, warm_up in warm_ups.items():
+            try:
+                warm_up.result()
+            except Exception as e:
+                print(f"Warning: {name} warm-up failed, continuing without it: {e}")
+    print("--- Services Warmed Up ---\n")
+
+def handle_shutdown_confirmation(asr: ASRInterface, load_confirm_asr: Optional[Callable[[], ASRInterface]] = None) -> bool:
     """
     Handles the shutdown confirmation process by recording user's response.
     
+    Args:
+        asr (ASRInterface): The already-initialized ASR service, used when no
+                            dedicated confirmation model is configured or it
+                            fails to load.
+        load_confirm_asr (Optional[Callable[[], ASRInterface]]): Returns a smaller
+                            ASR model for the yes/no reply. It is only called
+                            once a confirmation is actually needed.
+    
     Returns:
         bool: False to shutdown, True to continue running
     """
+    if load_confirm_asr is not None:
+        try:
+            asr = load_confirm_asr()
+        except Exception as e:
+            print(f"Warning: Could not load the confirmation ASR model, using the main one: {e}")
+
     try:
         print("\n🔴 系統關閉確認模式")
         print("請說「是」或「確定」來關閉系統，或說「否」、「取消」來繼續運行")
         
-        # Record user's confirmation
+        # Record user's confirmation (kept in memory, no temporary file)
         recorder = AudioRecorder()
-        confirmation_audio = recorder.record_audio(duration=3.0, countdown=True)
-        
-        # Use a simple ASR to get the confirmation
-        from src.asr import get_asr_model
-        asr_service = get_asr_model("whisper", model_name="base")
+        confirmation_audio = recorder.record_audio_array(duration=3.0, countdown=True)
         
-        confirmation_text = asr_service.transcribe(confirmation_audio).strip().lower()
+        # NFKC folds full-width letters (e.g. "ＹＥＳ") onto their ASCII forms
+        confirmation_text = unicodedata.normalize("NFKC", asr.transcribe_array(confirmation_audio, recorder.sample_rate)).strip().lower()
         print(f"確認回應: '{confirmation_text}'")
         
         # Check for positive confirmation
-        positive_words = ["是", "對", "確定", "關閉", "好", "yes", "確認"]
-        negative_words = ["否", "不", "取消", "繼續", "no", "不要"]
-        
-        if any(word in confirmation_text for word in positive_words):
+        if _POSITIVE_REPLY_RE.search(confirmation_text):
             speak("好的，正在關閉系統。再見！")
             print("👋 用戶確認關閉系統")
             return False  # Shutdown
-        elif any(word in confirmation_text for word in negative_words):
+        elif _NEGATIVE_REPLY_RE.search(confirmation_text):
             speak("好的，繼續運行系統。")
             print("✅ 用戶取消關閉，繼續運行")
             return True  # Continue
@@ -144,33 +281,99 @@ def handle_shutdown_confirmation() -> bool:
         print(f"關閉確認過程出錯: {e}")
         speak("確認過程出現問題，系統將繼續運行。")
         return True  # Continue on error
-    finally:
-        # Clean up confirmation audio file
-        try:
-            if 'confirmation_audio' in locals():
-                recorder.cleanup_temp_file(confirmation_audio)
-        except:
-            pass
 
-def get_user_inputs(config: AppConfig) -> tuple[str, Image.Image]:
+def get_user_inputs(config: AppConfig, asr: Optional[ASRInterface] = None, speculation: Optional[SpeculativeDecision] = None) -> tuple[Union[str, np.ndarray, "Future[str]"], bytes]:
     """
     Gets user inputs either from files or by recording from microphone.
 
     Args:
         config (AppConfig): Application configuration containing recording mode and file paths.
+        asr (Optional[ASRInterface]): The ASR service. When provided and streaming ASR is
+                                      enabled, the recording is transcribed while it is captured.
+        speculation (Optional[SpeculativeDecision]): In streaming mode, receives partial
+                                      transcripts and the image to issue an early VLM request.
 
     Returns:
-        A tuple containing the audio file path and the loaded PIL Image object.
+        A tuple containing the audio input and the VLM-ready image as JPEG bytes. The
+        audio input is an audio file path, a recorded 16 kHz sample array or, in
+        streaming mode, a future that resolves to the transcript. The decoded image is released on the worker
+        thread, so only the compressed payload is held during the VLM request.
     """
-    # Always load the image from file
+    global _LAST_SCENE_IMAGE
+    
+    # Always load the image from file. The stat call doubles as the existence
+    # check, and its mtime tells whether last turn's prepared image is still valid.
     image_path = config.TEST_IMAGE_FILE
-    if not os.path.exists(image_path):
+    try:
+        stat = os.stat(image_path)
+    except FileNotFoundError:
         print(f"ERROR: Image file not found at {image_path}")
-        raise FileNotFoundError
+        raise
+    image_key = (image_path, stat.st_mtime_ns, stat.st_size, config.VLM_MAX_IMAGE_SIDE)
+    
+    if _LAST_SCENE_IMAGE is not None and _LAST_SCENE_IMAGE[0] == image_key:
+        print(f"Reusing image: {os.path.basename(image_path)} (unchanged since last turn)")
+        prepared_image: "Future[bytes]" = Future()
+        prepared_image.set_result(_LAST_SCENE_IMAGE[1])
+        if speculation is not None:
+            speculation.attach_image(prepared_image)
+        audio_input = get_audio_input(config, asr, speculation)
+        return audio_input, prepared_image.result()
     
+    # `Image.open` only reads the header; the pixel data is decoded on a
+    # worker thread while the microphone records.
     image = Image.open(image_path)
     print(f"Loaded image: {os.path.basename(image_path)} (Size: {image.size})")
+    _draft_for_vlm(image, config.VLM_MAX_IMAGE_SIDE)
+    
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-decode") as executor:
+        prepared_image = executor.submit(_encode_for_vlm, image, config.VLM_MAX_IMAGE_SIDE)
+        del image
+        if speculation is not None:
+            speculation.attach_image(prepared_image)
+        audio_input = get_audio_input(config, asr, speculation)
+        image_bytes = prepared_image.result()
     
+    _LAST_SCENE_IMAGE = (image_key, image_bytes)
+    return audio_input, image_bytes
+
+def _draft_for_vlm(image: Image.Image, max_side: int) -> None:
+    """
+    Asks the decoder to downscale while decoding, before any pixels are loaded.
+
+    For JPEGs, libjpeg can scale by 1/2, 1/4 or 1/8 during the IDCT, which skips
+    the work for pixels that `prepare_image` would discard anyway. The
+    draft size never drops below the VLM resolution. Other formats ignore it.
+
+    Args:
+        image (Image.Image): A freshly opened, not yet loaded image.
+        max_side (int): The maximum width or height the VLM will receive.
+    """
+    width, height = image.size
+    scale = max_side / max(width, height)
+    if scale < 1:
+        image.draft("RGB", (round(width * scale), round(height * scale)))
+
+def _encode_for_vlm(image: Image.Image, max_side: int) -> bytes:
+    """
+    Prepares `image` for the VLM and returns it as JPEG bytes.
+    """
+    return encode_jpeg(prepare_image(image, max_side))
+
+def get_audio_input(config: AppConfig, asr: Optional[ASRInterface] = None, speculation: Optional[SpeculativeDecision] = None) -> Union[str, np.ndarray, "Future[str]"]:
+    """
+    Gets the user's audio command either from a file or by recording from microphone.
+
+    Args:
+        config (AppConfig): Application configuration containing recording mode and file paths.
+        asr (Optional[ASRInterface]): The ASR service, used for streaming transcription.
+        speculation (Optional[SpeculativeDecision]): Receives partial transcripts in streaming mode.
+
+    Returns:
+        Union[str, np.ndarray, Future[str]]: An audio file path, the recorded samples
+                                 (microphone mode) or, in streaming mode, a future
+                                 that resolves to the transcript.
+    """
     # Handle audio input based on recording mode
     if config.RECORDING_MODE == "microphone":
         print("--- 使用麥克風錄音模式 ---")
@@ -180,10 +383,13 @@ def get_user_inputs(config: AppConfig) -> tuple[str, Image.Image]:
         # recorder.list_audio_devices()
         
         try:
-            # Record audio from microphone
-            audio_path = recorder.record_audio(duration=5.0)
-            print(f"錄音完成，儲存至: {os.path.basename(audio_path)}")
-            return audio_path, image
+            if config.STREAMING_ASR and asr is not None:
+                # Segments are transcribed in the background while recording
+                on_partial = speculation.on_partial if speculation is not None else None
+                return StreamingTranscriber(asr, on_partial=on_partial).transcribe_live(duration=5.0)
+
+            # Record audio from microphone; the samples go to the ASR in memory
+            return recorder.record_audio_array(duration=5.0)
         except Exception as e:
             print(f"麥克風錄音失敗: {e}")
             print("切換至檔案模式...")
@@ -199,18 +405,95 @@ def get_user_inputs(config: AppConfig) -> tuple[str, Image.Image]:
         raise FileNotFoundError
     
     print(f"Loaded audio: {os.path.basename(audio_path)}")
-    return audio_path, image
+    return audio_path
 
-def process_command(asr: ASRInterface, vlm: VLMInterface, audio_path: str, image: Image.Image, prompt_template: str) -> bool:
+def _decision_cache_key(instruction_text: str, image: bytes) -> tuple[str, str]:
+    """
+    Builds a stable cache key for a (scene, instruction) pair.
+
+    Args:
+        instruction_text (str): The transcribed user instruction.
+        image (bytes): The JPEG-encoded visual context sent to the VLM.
+
+    Returns:
+        A tuple of the image content hash and the normalized instruction hash.
+    """
+    image_hash = hashlib.sha256(image).hexdigest()
+    text_hash = hashlib.sha1(instruction_text.strip().lower().encode("utf-8")).hexdigest()
+    return image_hash, text_hash
+
+def _lookup_cached_decision(key: tuple[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Returns a previously parsed VLM decision for `key`, or None on a miss.
+    A hit marks the entry as most recently used.
+    """
+    decision = _DECISION_CACHE.get(key)
+    if decision is not None:
+        _DECISION_CACHE.move_to_end(key)
+    return decision
+
+def _store_cached_decision(key: tuple[str, str], decision: Dict[str, Any]) -> None:
+    """
+    Stores a parsed VLM decision, evicting the least recently used entry
+    once the cache is full.
+    """
+    _DECISION_CACHE[key] = decision
+    _DECISION_CACHE.move_to_end(key)
+    if len(_DECISION_CACHE) > _DECISION_CACHE_MAX_ENTRIES:
+        _DECISION_CACHE.popitem(last=False)
+
+def _parse_decision(vlm_response_str: str) -> Dict[str, Any]:
+    """
+    Parses the VLM's raw response into a decision dictionary.
+
+    Args:
+        vlm_response_str (str): The raw text returned by the VLM.
+
+    Returns:
+        Dict[str, Any]: The decoded JSON decision.
+
+    Raises:
+        json.JSONDecodeError: If no valid JSON object can be extracted.
+    """
+    # Fast path: JSON-mode backends return a bare JSON document
+    try:
+        return json.loads(vlm_response_str)
+    except json.JSONDecodeError:
+        pass
+
+    # Fallback for backends without a JSON mode: clean up the response by
+    # removing markdown code blocks if present
+    cleaned_response = vlm_response_str.strip()
+
+    # Remove markdown code blocks
+    if cleaned_response.startswith("```json"):
+        cleaned_response = cleaned_response[7:]
+    if cleaned_response.endswith("```"):
+        cleaned_response = cleaned_response[:-3]
+
+    # Extract JSON from response that might have explanatory text
+    json_match = _JSON_OBJECT_RE.search(cleaned_response)
+    if json_match:
+        cleaned_response = json_match.group(0)
+
+    return json.loads(cleaned_response.strip())
+
+def process_command(asr: ASRInterface, vlm: VLMInterface, audio_input: Union[str, np.ndarray, "Future[str]"], image: bytes, prompt_template: str, speculation: Optional[SpeculativeDecision] = None, load_confirm_asr: Optional[Callable[[], ASRInterface]] = None) -> bool:
     """
     Executes the core logic: transcribe, decide, and act.
 
     Args:
         asr (ASRInterface): The initialized ASR service.
         vlm (VLMInterface): The initialized VLM service.
-        audio_path (str): Path to the user's audio command.
-        image (Image.Image): The visual context for the command.
+        audio_input (Union[str, np.ndarray, Future[str]]): Path to the user's audio command,
+                                               its recorded 16 kHz samples, or a future for
+                                               its transcript from streaming ASR.
+        image (bytes): The JPEG-encoded visual context for the command.
         prompt_template (str): The master prompt for the VLM.
+        speculation (Optional[SpeculativeDecision]): A VLM request already issued for a
+                                                     partial transcript, reused if it matches.
+        load_confirm_asr (Optional[Callable[[], ASRInterface]]): Passed through to
+                                                     `handle_shutdown_confirmation`.
         
     Returns:
         bool: True to continue running, False to shutdown the system.
@@ -218,7 +501,12 @@ def process_command(asr: ASRInterface, vlm: VLMInterface, audio_path: str, image
     # 1. Transcribe Audio to Text
     print("\n--- Step 1: Transcribing Audio ---")
     try:
-        instruction_text = asr.transcribe(audio_path)
+        if isinstance(audio_input, Future):
+            instruction_text = audio_input.result()
+        elif isinstance(audio_input, np.ndarray):
+            instruction_text = asr.transcribe_array(audio_input)
+        else:
+            instruction_text = asr.transcribe(audio_input)
         print(f"ASR Output: '{instruction_text}'")
         if not instruction_text.strip():
             speak("我沒有聽清楚，請您再說一次好嗎？")
@@ -232,38 +520,37 @@ def process_command(asr: ASRInterface, vlm: VLMInterface, audio_path: str, image
         speak("我在理解您的話時遇到了錯誤。")
         return True  # Continue running
 
-    # 2. Get Decision from VLM
+    # 2. Get Decision from VLM (or reuse a cached one for a repeated scene + instruction)
     print("\n--- Step 2: Getting Decision from VLM ---")
-    final_prompt = prompt_template.format(user_instruction_text=instruction_text)
-    try:
-        vlm_response_str = vlm.get_decision(final_prompt, image)
-        print(f"VLM Raw Response: {vlm_response_str}")
-    except Exception as e:
-        print(f"VLM Error: {e}")
-        speak("我無法連接到視覺推理中心，請檢查連線或 API 金鑰。")
-        return True  # Continue running
+    cache_key = _decision_cache_key(instruction_text, image)
+    decision = _lookup_cached_decision(cache_key)
+    if decision is not None:
+        print(f"VLM Cache Hit: {decision}")
+        if speculation is not None:
+            speculation.cancel()
+    else:
+        try:
+            vlm_response_str = speculation.response_for(instruction_text, _VLM_TIMEOUT_SECONDS) if speculation is not None else None
+            if vlm_response_str is None:
+                final_prompt = _build_prompt(prompt_template, instruction_text)
+                vlm_response_str, available = vlm.get_decision_within(
+                    final_prompt, image, _VLM_TIMEOUT_SECONDS, response_schema=_DECISION_SCHEMA
+                )
+                if not available:
+                    speak("我思考得太久了，請您再說一次好嗎？")
+                    return True  # Continue running
+            print(f"VLM Raw Response: {vlm_response_str}")
+        except Exception as e:
+            print(f"VLM Error: {e}")
+            speak("我無法連接到視覺推理中心，請檢查連線或 API 金鑰。")
+            return True  # Continue running
 
     # 3. Process VLM Response and Provide Feedback
     print("\n--- Step 3: Processing Response and Acting ---")
     try:
-        # Clean up the response by removing markdown code blocks if present
-        cleaned_response = vlm_response_str.strip()
-        
-        # Remove markdown code blocks
-        if cleaned_response.startswith("```json"):
-            cleaned_response = cleaned_response[7:]
-        if cleaned_response.endswith("```"):
-            cleaned_response = cleaned_response[:-3]
-        
-        # Extract JSON from response that might have explanatory text
-        import re
-        json_match = re.search(r'\{.*\}', cleaned_response, re.DOTALL)
-        if json_match:
-            cleaned_response = json_match.group(0)
-        
-        cleaned_response = cleaned_response.strip()
-        
-        decision = json.loads(cleaned_response)
+        if decision is None:
+            decision = _parse_decision(vlm_response_str)
+            _store_cached_decision(cache_key, decision)
         action = decision.get("action")
 
         if action == "shutdown":
@@ -273,7 +560,7 @@ def process_command(asr: ASRInterface, vlm: VLMInterface, audio_path: str, image
             speak(confirmation_message)
             
             # Get confirmation from user
-            return handle_shutdown_confirmation()
+            return handle_shutdown_confirmation(asr, load_confirm_asr)
             
         elif action == "clarify":
             question = decision.get("question", "我有個問題，但不確定是什麼。")
@@ -285,7 +572,7 @@ def process_command(asr: ASRInterface, vlm: VLMInterface, audio_path: str, image
             target = decision.get("target_description", "指定的物件")
             confirmation_text = f"好的，我現在會拿起{target}。"
             print(f"Action: Execute -> Task: '{confirmation_text}'")
-            speak(confirmation_text)
+            speak_stream(confirmation_text)
             # In a real system, this is where you would call the robot control module.
             return True  # Continue running
             
@@ -296,7 +583,7 @@ def process_command(asr: ASRInterface, vlm: VLMInterface, audio_path: str, image
     except json.JSONDecodeError:
         print("VLM Error: Response was not valid JSON. Speaking raw response.")
         speak("我的思考過程出現格式錯誤，以下是我的想法：")
-        speak(vlm_response_str)
+        speak_stream(vlm_response_str)
         return True  # Continue running
     except Exception as e:
         print(f"Error during action processing: {e}")
@@ -314,6 +601,16 @@ def main():
     
     config = AppConfig()
     asr_service, vlm_service = initialize_services(config)
+    if config.WARM_UP_SERVICES:
+        warm_up_services(asr_service, vlm_service)
+    
+    # The confirmation model is loaded lazily on the first shutdown request.
+    # Only the Whisper backends share model names with CONFIRM_ASR_MODEL.
+    load_confirm_asr = None
+    if (config.CONFIRM_ASR_MODEL and config.CONFIRM_ASR_MODEL != config.WHISPER_MODEL
+            and config.ASR_SERVICE in ("whisper", "faster_whisper")):
+        # get_asr_model caches instances, so the model is only loaded once
+        load_confirm_asr = partial(get_asr_model, config.ASR_SERVICE, model_name=config.CONFIRM_ASR_MODEL)
     
     print("🤖 系統已啟動！說「關閉系統」來安全退出")
     print("=============================================\n")
@@ -322,15 +619,20 @@ def main():
     session_count = 0
     while True:
         session_count += 1
-        audio_path = None
+        speculation = None
+        if config.SPECULATIVE_VLM:
+            speculation = SpeculativeDecision(
+                vlm_service,
+                partial(_build_prompt, config.VLM_PROMPT_TEMPLATE),
+                response_schema=_DECISION_SCHEMA,
+            )
         
         try:
             print(f"\n🔄 === 第 {session_count} 次互動 ===")
-            audio_file, image_file = get_user_inputs(config)
-            audio_path = audio_file
+            audio_file, image_file = get_user_inputs(config, asr_service, speculation)
             
             # Process command and check if system should continue
-            should_continue = process_command(asr_service, vlm_service, audio_file, image_file, config.VLM_PROMPT_TEMPLATE)
+            should_continue = process_command(asr_service, vlm_service, audio_file, image_file, config.VLM_PROMPT_TEMPLATE, speculation, load_confirm_asr)
             
             if not should_continue:
                 print("\n🛑 系統正在關閉...")
@@ -355,13 +657,9 @@ def main():
             print("系統將繼續等待下一個指令...\n")
             
         finally:
-            # Clean up temporary recording file if it was created
-            if audio_path and config.RECORDING_MODE == "microphone":
-                try:
-                    recorder = AudioRecorder()
-                    recorder.cleanup_temp_file(audio_path)
-                except:
-                    pass  # Ignore cleanup errors
+            # Drop any speculative VLM request that was not consumed
+            if speculation is not None:
+                speculation.cancel()
 
     print("\n=============================================")
     print("           系統已安全關閉           ")
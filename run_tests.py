@@ -1,7 +1,11 @@
 # run_tests.py
+import io
 import os
 from PIL import Image
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Tuple
 
 # Add src to the Python path to allow direct imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'src')))
@@ -76,6 +80,194 @@ def test_tts_module():
         print("Note: TTS tests can fail due to audio device issues or internet connection problems.")
         return False
 
+def test_sentence_splitting():
+    """
+    Tests how `speak_stream` chunks text for sentence-by-sentence synthesis.
+    """
+    print("\n--- Testing Sentence Splitting ---")
+    try:
+        from tts.tts_module import _split_sentences
+
+        # Sentence endings always split; a comma splits once the clause holds
+        # enough words (each CJK character counts as one).
+        assert _split_sentences("好的。我現在會拿起紅色的蘋果，然後放到碗裡。") == ["好的。", "我現在會拿起紅色的蘋果，", "然後放到碗裡。"]
+        # A short clause stays with the rest of its sentence.
+        assert _split_sentences("OK, done. Next") == ["OK, done.", "Next"]
+        assert _split_sentences("   ") == []
+
+        print("Sentence Splitting Test: PASSED")
+        return True
+    except Exception as e:
+        print(f"Sentence Splitting Test: FAILED - {e!r}")
+        return False
+
+def test_decision_parsing():
+    """
+    Tests parsing of raw VLM responses into decision dictionaries.
+    """
+    print("\n--- Testing Decision Parsing ---")
+    try:
+        import json
+        from main import _parse_decision
+
+        expected = {"action": "pick_up", "target_description": "紅色的蘋果"}
+        raw = json.dumps(expected, ensure_ascii=False)
+        assert _parse_decision(raw) == expected
+        assert _parse_decision(f"```json\n{raw}\n```") == expected
+        assert _parse_decision(f"Here is the plan: {raw} Hope this helps.") == expected
+        try:
+            _parse_decision("I am not sure what you mean.")
+        except json.JSONDecodeError:
+            pass
+        else:
+            raise AssertionError("a response without JSON was accepted")
+
+        print("Decision Parsing Test: PASSED")
+        return True
+    except Exception as e:
+        print(f"Decision Parsing Test: FAILED - {e!r}")
+        return False
+
+def test_task_cache():
+    """
+    Tests the task cache's near-duplicate scene matching and LRU eviction.
+    """
+    print("\n--- Testing Task Cache ---")
+    try:
+        from task_cache import TaskCache
+
+        plan = [{"step": 1, "action": "PICK", "target": "the apple"}]
+        cache = TaskCache(max_entries=2, max_distance=5)
+        cache.put(("task", 0), plan)
+
+        # Scenes whose pHashes differ by at most `max_distance` bits match.
+        assert cache.get(("task", 0b11111)) == plan
+        assert cache.get(("task", 0b111111)) is None
+        assert cache.get(("other task", 0)) is None
+
+        # Callers get a copy they can modify freely.
+        cache.get(("task", 0))[0]["action"] = "DROP"
+        assert cache.get(("task", 0)) == plan
+
+        # The least recently used entry is evicted first.
+        cache.put(("second", 0), plan)
+        cache.get(("task", 0))
+        cache.put(("third", 0), plan)
+        assert cache.get(("second", 0)) is None
+        assert cache.get(("task", 0)) == plan
+
+        print("Task Cache Test: PASSED")
+        return True
+    except Exception as e:
+        print(f"Task Cache Test: FAILED - {e!r}")
+        return False
+
+def test_vlm_batcher():
+    """
+    Tests that the batcher groups requests, keeps their order, and skips
+    cancelled ones.
+    """
+    print("\n--- Testing VLM Batcher ---")
+    try:
+        from vlm.batcher import VLMBatcher
+
+        class EchoVLM(VLMInterface):
+            def __init__(self):
+                self.batches = []
+
+            def get_decision(self, text, image, response_schema=None):
+                return self.get_decision_batch([text], [image])[0]
+
+            def get_decision_batch(self, texts, images, response_schema=None):
+                self.batches.append(list(texts))
+                return [f"reply to {text}" for text in texts]
+
+        vlm_service = EchoVLM()
+        batcher = VLMBatcher(vlm_service, max_batch_size=8, max_wait=0.2)
+        try:
+            futures = [batcher.submit(text, b"") for text in ("a", "b", "c")]
+            cancelled = batcher.submit("d", b"")
+            assert cancelled.cancel()
+            assert [future.result(timeout=5) for future in futures] == ["reply to a", "reply to b", "reply to c"]
+            assert vlm_service.batches == [["a", "b", "c"]]
+        finally:
+            batcher.close()
+        try:
+            batcher.submit("e", b"")
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("a closed batcher accepted a request")
+
+        print("VLM Batcher Test: PASSED")
+        return True
+    except Exception as e:
+        print(f"VLM Batcher Test: FAILED - {e!r}")
+        return False
+
+def test_streaming_segmentation():
+    """
+    Tests where the streaming transcriber cuts a recording into segments.
+    """
+    print("\n--- Testing Streaming Segmentation ---")
+    try:
+        import numpy as np
+        from src.streaming_asr import StreamingTranscriber
+
+        # One-second chunks at 10 Hz: loud (L) or silent (S).
+        loud = np.full((10, 1), 0.5, dtype=np.float32)
+        silent = np.zeros((10, 1), dtype=np.float32)
+
+        class FakeRecorder:
+            sample_rate = 10
+
+            def stream_audio(self, duration, countdown=True):
+                # Cut at the first quiet chunk after 2 s, forced cut at 4 s,
+                # and a trailing all-silent segment that is never transcribed.
+                yield from [loud, loud, silent, loud, loud, loud, loud, silent, silent]
+
+        class LengthASR:
+            def transcribe_array(self, audio, sample_rate=16000):
+                return f"<{audio.shape[0] // sample_rate}s>"
+
+        partials = []
+        transcriber = StreamingTranscriber(LengthASR(), recorder=FakeRecorder(), segment_seconds=2.0, on_partial=partials.append)
+        assert transcriber.transcribe_live(countdown=False).result(timeout=5) == "<3s><4s>"
+        assert partials == ["<3s>", "<3s><4s>"]
+
+        print("Streaming Segmentation Test: PASSED")
+        return True
+    except Exception as e:
+        print(f"Streaming Segmentation Test: FAILED - {e!r}")
+        return False
+
+class _ThreadLocalStdout(io.TextIOBase):
+    """
+    A stdout proxy that sends each thread's output to its own buffer, if one
+    is set, so tests running in parallel do not interleave their logs.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self._stream).write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def capture(self, test_fn: Callable[[], bool]) -> Tuple[bool, str]:
+        """
+        Runs `test_fn` on the current thread and returns its result and output.
+        """
+        self._local.buffer = io.StringIO()
+        try:
+            return test_fn(), self._local.buffer.getvalue()
+        finally:
+            self._local.buffer = None
+
 def run_all_tests():
     """
     Runs all defined tests and reports a summary.
@@ -84,12 +276,33 @@ def run_all_tests():
     print("  Running Project Test Suite  ")
     print("=============================")
     
-    results = {
-        "ASR": test_asr_module(),
-        "VLM": test_vlm_module(),
-        "TTS": test_tts_module(),
+    tests = {
+        "ASR": test_asr_module,
+        "VLM": test_vlm_module,
+        "TTS": test_tts_module,
+        "Sentence Splitting": test_sentence_splitting,
+        "Decision Parsing": test_decision_parsing,
+        "Task Cache": test_task_cache,
+        "VLM Batcher": test_vlm_batcher,
+        "Streaming Segmentation": test_streaming_segmentation,
     }
     
+    # The tests are independent, so model loading and audio playback overlap.
+    # Each test's output is buffered and printed in order once all finish.
+    stdout = _ThreadLocalStdout(sys.stdout)
+    sys.stdout = stdout
+    try:
+        with ThreadPoolExecutor(max_workers=len(tests)) as pool:
+            futures = {name: pool.submit(stdout.capture, test_fn) for name, test_fn in tests.items()}
+            outcomes = {name: future.result() for name, future in futures.items()}
+    finally:
+        sys.stdout = stdout._stream
+    
+    results = {}
+    for test_name, (result, output) in outcomes.items():
+        print(output, end="")
+        results[test_name] = result
+    
     print("\n--- Test Summary ---")
     all_passed = True
     for test_name, result in results.items():
@@ -18,10 +18,13 @@ To add a new ASR service:
    an instance of your new class.
 """
 
+import importlib
+from functools import lru_cache
 from typing import Any
 from .asr_interface import ASRInterface
-from .whisper_asr import WhisperASR
-from .funasr_asr import FunASR
+
+# Backends are imported only when selected, so importing this package (or
+# choosing FunASR) does not pull in torch, whisper or ctranslate2.
 
 def get_asr_model(service_name: str = "whisper", **kwargs: Any) -> ASRInterface:
     """
@@ -32,9 +35,14 @@ def get_asr_model(service_name: str = "whisper", **kwargs: Any) -> ASRInterface:
     This approach allows for flexible configuration and easy swapping of
     backend ASR technologies.
 
+    Instances are cached per (service_name, kwargs), so repeated calls with
+    the same arguments return the same object and Whisper weights are loaded
+    only once per process. Calls with unhashable keyword arguments are not
+    cached; use `reset_cache` to drop cached instances.
+
     Args:
         service_name (str): The identifier for the desired ASR service.
-                          Supported values: "whisper", "funasr".
+                          Supported values: "whisper", "faster_whisper", "funasr".
                           Defaults to "whisper".
         **kwargs: Additional keyword arguments that will be passed to the
                   constructor of the selected ASR service. For example, you
@@ -46,16 +54,50 @@ def get_asr_model(service_name: str = "whisper", **kwargs: Any) -> ASRInterface:
     Raises:
         ValueError: If the specified `service_name` is not supported.
     """
+    try:
+        kwargs_key = tuple(sorted(kwargs.items()))
+        hash(kwargs_key)
+    except TypeError:
+        # Unhashable arguments (e.g., a list) cannot form a cache key.
+        return _create_asr_model(service_name, **kwargs)
+    return _get_cached_asr_model(service_name, kwargs_key)
+
+@lru_cache(maxsize=None)
+def _get_cached_asr_model(service_name: str, kwargs_key: tuple) -> ASRInterface:
+    """
+    Creates the ASR service for a hashable (service_name, sorted kwargs) key, once.
+    """
+    return _create_asr_model(service_name, **dict(kwargs_key))
+
+def _create_asr_model(service_name: str, **kwargs: Any) -> ASRInterface:
+    """
+    Instantiates the requested ASR service without caching.
+    """
     if service_name == "whisper":
         # Pass any additional kwargs to the WhisperASR constructor.
         # This allows for flexible model selection (e.g., "base", "large").
+        WhisperASR = importlib.import_module(".whisper_asr", __package__).WhisperASR
         return WhisperASR(**kwargs)
+    elif service_name == "faster_whisper":
+        # CTranslate2 backend with INT8 weights; accepts the same `model_name`
+        # plus decoding options such as `beam_size` and `vad_filter`.
+        FasterWhisperASR = importlib.import_module(".faster_whisper_asr", __package__).FasterWhisperASR
+        return FasterWhisperASR(**kwargs)
     elif service_name == "funasr":
         # The mock FunASR currently doesn't take args, but a real one might.
+        FunASR = importlib.import_module(".funasr_asr", __package__).FunASR
         return FunASR(**kwargs)
     else:
         raise ValueError(f"Unsupported ASR model: '{service_name}'")
 
+def reset_cache() -> None:
+    """
+    Drops all cached ASR service instances, so the next `get_asr_model`
+    call creates a new one. Callers remain responsible for releasing the old
+    instances.
+    """
+    _get_cached_asr_model.cache_clear()
+
 # Expose the core components of the package for easy access.
 # This allows other parts of the application to import them via `from src.asr import ...`
-__all__ = ["ASRInterface", "get_asr_model"]
+__all__ = ["ASRInterface", "get_asr_model", "reset_cache"]
@@ -1,5 +1,10 @@
 # src/asr/asr_interface.py
 from abc import ABC, abstractmethod
+import os
+import tempfile
+import wave
+import numpy as np
+from typing import List
 
 class ASRInterface(ABC):
     """
@@ -30,3 +35,68 @@ class ASRInterface(ABC):
                        process (e.g., model loading issues, invalid audio format).
         """
         pass
+
+    def transcribe_batch(self, audio_file_paths: List[str]) -> List[str]:
+        """
+        Transcribes several audio files.
+
+        The default implementation calls `transcribe` for each file in turn.
+        Services that can run several utterances through the model at once
+        should override it.
+
+        Args:
+            audio_file_paths (List[str]): The paths of the audio files.
+
+        Returns:
+            List[str]: The transcribed texts, in the same order as the files.
+
+        Raises:
+            FileNotFoundError: If any of the audio files cannot be found.
+            Exception: For any underlying errors during transcription.
+        """
+        return [self.transcribe(path) for path in audio_file_paths]
+
+    def transcribe_array(self, audio: np.ndarray, sample_rate: int = 16000) -> str:
+        """
+        Transcribes in-memory audio, such as a fresh microphone recording.
+
+        The default implementation writes the audio to a temporary WAV file
+        and calls `transcribe`. Services that can consume samples directly
+        should override it to skip the file round trip.
+
+        Args:
+            audio (np.ndarray): Mono float32 samples in the range [-1, 1].
+            sample_rate (int): The sample rate of `audio` in Hz. Defaults to 16000.
+
+        Returns:
+            str: The transcribed text, expected to be in Traditional Chinese.
+
+        Raises:
+            Exception: For any underlying errors during the transcription process.
+        """
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+            temp_path = temp_file.name
+        try:
+            with wave.open(temp_path, "w") as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)  # 2 bytes for int16
+                wav_file.setframerate(sample_rate)
+                scaled = np.multiply(np.ravel(audio), 32767.0, dtype=np.float32)
+                np.clip(scaled, -32768.0, 32767.0, out=scaled)
+                wav_file.writeframes(scaled.astype(np.int16).tobytes())
+            return self.transcribe(temp_path)
+        finally:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+    def warm_up(self) -> None:
+        """
+        Runs a throwaway inference so the first real request is not slowed
+        down by one-time costs (e.g., CUDA kernel selection, lazy allocations).
+
+        The default implementation does nothing; services with a noticeable
+        cold-start cost should override it.
+        """
+        pass
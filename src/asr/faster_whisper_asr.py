@@ -0,0 +1,146 @@
+from .asr_interface import ASRInterface
+from faster_whisper import WhisperModel
+import ctranslate2
+import numpy as np
+import os
+from typing import Optional
+
+class FasterWhisperASR(ASRInterface):
+    """
+    Provides an Automatic Speech Recognition (ASR) service using faster-whisper,
+    a CTranslate2 re-implementation of OpenAI's Whisper model.
+
+    Compared to the reference PyTorch implementation, CTranslate2 runs the same
+    Whisper weights with INT8 quantization and fused kernels, which makes
+    transcription several times faster and uses considerably less memory on
+    both CPU and GPU.
+
+    Note:
+        Audio decoding is handled by PyAV, so `ffmpeg` does not need to be on
+        the system's PATH for this backend.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "base",
+        device: Optional[str] = None,
+        compute_type: Optional[str] = None,
+        beam_size: int = 1,
+        vad_filter: bool = True,
+        condition_on_previous_text: bool = False,
+    ) -> None:
+        """
+        Loads a specified Whisper model through CTranslate2.
+
+        Args:
+            model_name (str): The name of the Whisper model to load (e.g., "tiny",
+                              "base", "small", "medium", "large-v3"). Defaults to "base".
+            device (Optional[str]): "cuda" or "cpu". Defaults to CUDA when available.
+            compute_type (Optional[str]): The CTranslate2 quantization type. Defaults
+                                          to "int8_float16" on GPU and "int8" on CPU.
+            beam_size (int): Beam size used for decoding. Greedy decoding (1) is the
+                             fastest and is sufficient for short commands.
+            vad_filter (bool): Whether to drop non-speech regions with Silero VAD
+                               before decoding.
+            condition_on_previous_text (bool): Whether to feed the previous window's
+                                               text as a prompt to the next window.
+        """
+        if device is None:
+            device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+        if compute_type is None:
+            compute_type = "int8_float16" if device == "cuda" else "int8"
+
+        self.beam_size = beam_size
+        self.vad_filter = vad_filter
+        self.condition_on_previous_text = condition_on_previous_text
+
+        print(f"FasterWhisperASR: Loading model '{model_name}' onto device '{device}' ({compute_type}).")
+        try:
+            self.model = WhisperModel(model_name, device=device, compute_type=compute_type)
+            print("FasterWhisperASR: Model loaded successfully.")
+        except Exception as e:
+            print(f"FasterWhisperASR: Failed to load model '{model_name}'. Error: {e}")
+            raise
+
+    def warm_up(self) -> None:
+        """
+        Decodes half a second of silence to pay first-inference costs upfront.
+
+        The VAD filter is disabled here, otherwise the silent clip would be
+        dropped before it ever reached the model.
+        """
+        print("FasterWhisperASR: Warming up model...")
+        silence = np.zeros(8000, dtype=np.float32)  # 0.5 s at 16 kHz
+        segments, _ = self.model.transcribe(silence, language="zh", beam_size=self.beam_size, vad_filter=False)
+        list(segments)  # Decoding is lazy; consume the generator to run it.
+        print("FasterWhisperASR: Warm-up complete.")
+
+    def transcribe_array(self, audio: np.ndarray, sample_rate: int = 16000) -> str:
+        """
+        Transcribes in-memory audio without writing or decoding a file.
+
+        Args:
+            audio (np.ndarray): Mono float32 samples in the range [-1, 1].
+            sample_rate (int): The sample rate of `audio` in Hz. Audio that is not
+                               at 16 kHz goes through the file-based path, where
+                               it is resampled on decode.
+
+        Returns:
+            str: The transcribed text as a string.
+
+        Raises:
+            Exception: For errors raised by faster-whisper during decoding.
+        """
+        if sample_rate != 16000:
+            return super().transcribe_array(audio, sample_rate)
+
+        try:
+            print(f"FasterWhisperASR: Starting transcription for {len(audio) / sample_rate:.1f}s of recorded audio...")
+            samples = np.ascontiguousarray(np.ravel(audio), dtype=np.float32)
+            segments, _ = self.model.transcribe(
+                samples,
+                language="zh",
+                beam_size=self.beam_size,
+                vad_filter=self.vad_filter,
+                condition_on_previous_text=self.condition_on_previous_text,
+            )
+            transcribed_text = "".join(segment.text for segment in segments).strip()
+            print("FasterWhisperASR: Transcription successful.")
+            return transcribed_text
+        except Exception as e:
+            print(f"FasterWhisperASR: An error occurred during transcription: {e}")
+            raise
+
+    def transcribe(self, audio_file_path: str) -> str:
+        """
+        Transcribes an audio file into Traditional Chinese text.
+
+        Args:
+            audio_file_path (str): The absolute path to the audio file.
+
+        Returns:
+            str: The transcribed text as a string.
+
+        Raises:
+            FileNotFoundError: If the audio file does not exist at the given path.
+            Exception: For errors raised by faster-whisper during decoding.
+        """
+        if not os.path.exists(audio_file_path):
+            raise FileNotFoundError(f"Audio file not found at: {audio_file_path}")
+
+        try:
+            print(f"FasterWhisperASR: Starting transcription for {os.path.basename(audio_file_path)}...")
+            segments, _ = self.model.transcribe(
+                audio_file_path,
+                language="zh",
+                beam_size=self.beam_size,
+                vad_filter=self.vad_filter,
+                condition_on_previous_text=self.condition_on_previous_text,
+            )
+            # `segments` is a lazy generator; decoding happens while it is consumed.
+            transcribed_text = "".join(segment.text for segment in segments).strip()
+            print("FasterWhisperASR: Transcription successful.")
+            return transcribed_text
+        except Exception as e:
+            print(f"FasterWhisperASR: An error occurred during transcription: {e}")
+            raise
@@ -2,7 +2,13 @@
 from .asr_interface import ASRInterface
 import whisper
 import os
+import numpy as np
 import torch
+from pathlib import Path
+from typing import List, Optional, Union
+
+# Re-serialized checkpoints that can be memory-mapped on later starts.
+_MMAP_CACHE_DIR = Path.home() / ".cache" / "whisper_mmap"
 
 class WhisperASR(ASRInterface):
     """
@@ -19,7 +25,7 @@ class WhisperASR(ASRInterface):
         accessible in the environment's PATH for audio processing.
     """
 
-    def __init__(self, model_name: str = "base") -> None:
+    def __init__(self, model_name: str = "base", compile_model: bool = True, precision: str = "auto", mmap_cache: bool = True) -> None:
         """
         Loads a specified Whisper model into memory.
 
@@ -32,16 +38,232 @@ class WhisperASR(ASRInterface):
                               Larger models offer higher accuracy at the cost of
                               increased resource consumption and slower speed.
                               Defaults to "base".
+            compile_model (bool): On CUDA, compile the encoder and decoder with
+                              `torch.compile` and run a warm-up transcription so
+                              the compilation cost is paid here rather than on
+                              the first command. Defaults to True.
+            precision (str): Weight precision. "fp16" keeps the weights in half
+                              precision (CUDA only), "int8" applies dynamic int8
+                              quantization to the linear layers (CPU only), and
+                              "fp32" leaves them as loaded. "auto" picks "fp16" on
+                              CUDA and "int8" on CPU. Defaults to "auto".
+            mmap_cache (bool): Keep a copy of the checkpoint under
+                              `~/.cache/whisper_mmap` and memory-map it on later
+                              starts instead of reading and unpickling the whole
+                              file. Defaults to True.
+
+        Raises:
+            ValueError: If `precision` is unknown or not supported on the device.
         """
         device = "cuda" if torch.cuda.is_available() else "cpu"
+        if precision == "auto":
+            precision = "fp16" if device == "cuda" else "int8"
+        if precision not in ("fp16", "int8", "fp32"):
+            raise ValueError(f"Unsupported precision: '{precision}'")
+        if precision == "fp16" and device != "cuda":
+            raise ValueError("fp16 precision requires a CUDA device.")
+        if precision == "int8" and device != "cpu":
+            raise ValueError("int8 dynamic quantization is only supported on CPU.")
+        # Whisper must be told to feed fp16 inputs when the weights are fp16.
+        self._fp16 = precision == "fp16"
         print(f"WhisperASR: Loading model '{model_name}' onto device '{device}'.")
         try:
-            self.model = whisper.load_model(model_name, device=device)
+            self.model = self._load_model(model_name, device, mmap_cache)
             print("WhisperASR: Model loaded successfully.")
         except Exception as e:
             print(f"WhisperASR: Failed to load model '{model_name}'. Error: {e}")
             raise
 
+        # Decoding is memory-bandwidth bound, so smaller weights decode faster.
+        if precision == "fp16":
+            self.model = self.model.half()
+        elif precision == "int8":
+            self._quantize_int8()
+        print(f"WhisperASR: Using {precision} weights.")
+
+        # Page-locked staging buffer for recorded audio, sized for Whisper's
+        # 30-second window, so host-to-device copies can run asynchronously.
+        self._pinned_audio: Optional[torch.Tensor] = None
+        if device == "cuda":
+            self._pinned_audio = torch.empty(whisper.audio.N_SAMPLES, dtype=torch.float32).pin_memory()
+
+        if compile_model and device == "cuda" and hasattr(torch, "compile"):
+            self._compile_model()
+
+    def _load_model(self, model_name: str, device: str, mmap_cache: bool) -> whisper.Whisper:
+        """
+        Loads the model, from the memory-mapped checkpoint cache when possible.
+
+        On a cache miss the model is loaded with `whisper.load_model` and its
+        checkpoint is re-saved in the zip format `torch.load(mmap=True)` needs.
+        Any problem with the cache falls back to the regular loader.
+        """
+        if not mmap_cache or model_name not in whisper.available_models():
+            return whisper.load_model(model_name, device=device)
+
+        cache_path = _MMAP_CACHE_DIR / f"{model_name}.pt"
+        if cache_path.exists():
+            try:
+                # Pages are faulted in on first use instead of copied up front.
+                checkpoint = torch.load(cache_path, map_location="cpu", mmap=True, weights_only=True)
+                model = whisper.model.Whisper(whisper.model.ModelDimensions(**checkpoint["dims"]))
+                model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+                alignment_heads = getattr(whisper, "_ALIGNMENT_HEADS", {}).get(model_name)
+                if alignment_heads is not None:
+                    model.set_alignment_heads(alignment_heads)
+                print(f"WhisperASR: Loaded memory-mapped checkpoint from {cache_path}.")
+                return model.to(device)
+            except Exception as e:
+                print(f"WhisperASR: Could not load cached checkpoint, reloading. Error: {e}")
+
+        model = whisper.load_model(model_name, device=device)
+        try:
+            _MMAP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            temp_path = cache_path.with_suffix(".tmp")
+            # Same layout as Whisper's own checkpoints.
+            torch.save({"dims": model.dims.__dict__, "model_state_dict": model.state_dict()}, temp_path)
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            print(f"WhisperASR: Could not write checkpoint cache. Error: {e}")
+        return model
+
+    def _quantize_int8(self) -> None:
+        """
+        Replaces the model's linear layers with dynamically quantized int8 ones.
+        """
+        for module in self.model.modules():
+            if isinstance(module, whisper.model.Linear):
+                # Whisper's Linear subclass only casts weights to the input dtype,
+                # a no-op in fp32; `quantize_dynamic` only recognizes plain nn.Linear.
+                module.__class__ = torch.nn.Linear
+        self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    def _compile_model(self) -> None:
+        """
+        Compiles the encoder and decoder, reverting to eager mode on any failure.
+        """
+        encoder, decoder = self.model.encoder, self.model.decoder
+        print("WhisperASR: Compiling encoder and decoder with torch.compile...")
+        try:
+            # The encoder always sees a padded 30-second mel window, so its input
+            # shape is static and CUDA graphs ("reduce-overhead") apply.
+            self.model.encoder = torch.compile(encoder, mode="reduce-overhead")
+            # The decoder's token sequence grows each step; compiling it with
+            # dynamic shapes avoids a recompilation per length.
+            self.model.decoder = torch.compile(decoder, dynamic=True)
+            # Compilation is lazy; run it now instead of on the first command.
+            self.warm_up()
+        except Exception as e:
+            print(f"WhisperASR: torch.compile failed, using eager mode. Error: {e}")
+            self.model.encoder, self.model.decoder = encoder, decoder
+
+    def warm_up(self) -> None:
+        """
+        Transcribes half a second of silence to pay first-inference costs upfront.
+        """
+        print("WhisperASR: Warming up model...")
+        silence = np.zeros(whisper.audio.SAMPLE_RATE // 2, dtype=np.float32)
+        self.model.transcribe(silence, language="chinese", fp16=self._fp16)
+        print("WhisperASR: Warm-up complete.")
+
+    def transcribe_array(self, audio: np.ndarray, sample_rate: int = 16000) -> str:
+        """
+        Transcribes in-memory audio without writing a file or running ffmpeg.
+
+        Args:
+            audio (np.ndarray): Mono float32 samples in the range [-1, 1].
+            sample_rate (int): The sample rate of `audio` in Hz. Audio that is not
+                               at Whisper's 16 kHz goes through the file-based path,
+                               where ffmpeg resamples it.
+
+        Returns:
+            str: The transcribed text as a string.
+
+        Raises:
+            Exception: For errors raised by the Whisper library during transcription.
+        """
+        if sample_rate != whisper.audio.SAMPLE_RATE:
+            return super().transcribe_array(audio, sample_rate)
+
+        try:
+            print(f"WhisperASR: Starting transcription for {len(audio) / sample_rate:.1f}s of recorded audio...")
+            samples = np.ascontiguousarray(np.ravel(audio), dtype=np.float32)
+            result = self.model.transcribe(self._to_model_device(samples), language="chinese", fp16=self._fp16)
+
+            transcribed_text = result.get("text", "").strip()
+            print("WhisperASR: Transcription successful.")
+            return transcribed_text
+        except Exception as e:
+            print(f"WhisperASR: An error occurred during transcription: {e}")
+            raise
+
+    def transcribe_batch(self, audio_file_paths: List[str]) -> List[str]:
+        """
+        Transcribes several short utterances in one batched forward pass.
+
+        Each file's log-mel spectrogram is padded to Whisper's 30-second window
+        and the stack is decoded with a single `whisper.decode` call, so the
+        encoder runs once for the whole batch and decoding proceeds in lockstep.
+        Unlike `transcribe`, only the first 30 seconds of each file are used,
+        which suits push-to-talk commands.
+
+        Args:
+            audio_file_paths (List[str]): The paths of the audio files.
+
+        Returns:
+            List[str]: The transcribed texts, in the same order as the files.
+
+        Raises:
+            FileNotFoundError: If any of the audio files does not exist.
+            Exception: For errors raised by the Whisper library during transcription.
+        """
+        for audio_file_path in audio_file_paths:
+            if not os.path.exists(audio_file_path):
+                raise FileNotFoundError(f"Audio file not found at: {audio_file_path}")
+        if len(audio_file_paths) <= 1:
+            return super().transcribe_batch(audio_file_paths)
+
+        try:
+            print(f"WhisperASR: Starting batched transcription of {len(audio_file_paths)} files...")
+            mels = [
+                whisper.pad_or_trim(
+                    whisper.log_mel_spectrogram(whisper.load_audio(path), self.model.dims.n_mels),
+                    whisper.audio.N_FRAMES,
+                )
+                for path in audio_file_paths
+            ]
+            mel_batch = torch.stack(mels).to(self.model.device)
+            if self._fp16:
+                mel_batch = mel_batch.half()
+
+            options = whisper.DecodingOptions(language="chinese", fp16=self._fp16, without_timestamps=True)
+            results = whisper.decode(self.model, mel_batch, options)
+
+            transcribed_texts = [result.text.strip() for result in results]
+            print("WhisperASR: Batched transcription successful.")
+            return transcribed_texts
+        except Exception as e:
+            print(f"WhisperASR: An error occurred during batched transcription: {e}")
+            raise
+
+    def _to_model_device(self, samples: np.ndarray) -> Union[np.ndarray, torch.Tensor]:
+        """
+        Moves recorded samples to the GPU through the pinned staging buffer.
+
+        Whisper computes the log-mel spectrogram on whichever device the audio
+        is on, so this also moves the STFT from the CPU to the GPU. On CPU the
+        samples are returned unchanged.
+        """
+        if self._pinned_audio is None:
+            return samples
+        if samples.shape[0] > self._pinned_audio.shape[0]:
+            self._pinned_audio = torch.empty(samples.shape[0], dtype=torch.float32).pin_memory()
+        # Transcriptions run one at a time, and each one synchronizes with the
+        # GPU before returning, so the previous copy out of the buffer is done.
+        staging = self._pinned_audio[:samples.shape[0]]
+        staging.copy_(torch.from_numpy(samples))
+        return staging.to(self.model.device, non_blocking=True)
+
     def transcribe(self, audio_file_path: str) -> str:
         """
         Transcribes an audio file into Traditional Chinese text.
@@ -67,7 +289,7 @@ class WhisperASR(ASRInterface):
         try:
             print(f"WhisperASR: Starting transcription for {os.path.basename(audio_file_path)}...")
             # The 'language' parameter helps improve accuracy by focusing the model.
-            result = self.model.transcribe(audio_file_path, language="chinese", fp16=torch.cuda.is_available())
+            result = self.model.transcribe(audio_file_path, language="chinese", fp16=self._fp16)
             
             transcribed_text = result.get("text", "").strip()
             print("WhisperASR: Transcription successful.")
@@ -9,6 +9,7 @@ during the recording process.
 
 Classes:
     AudioRecorder: Handles microphone recording and WAV file generation
+    StreamingRecorder: Delivers microphone audio in chunks while recording
 
 Dependencies:
     sounddevice: For real-time audio capture
@@ -20,8 +21,10 @@ import sounddevice as sd
 import numpy as np
 import wave
 import tempfile
+import queue
+import math
 import os
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Iterator
 
 class AudioRecorder:
     """
@@ -31,18 +34,23 @@ class AudioRecorder:
     save it as a WAV file, and manage the recording process with user feedback.
     """
     
-    def __init__(self, sample_rate: int = 16000, channels: int = 1) -> None:
+    def __init__(self, sample_rate: int = 16000, channels: int = 1, max_interactive_seconds: float = 60.0) -> None:
         """
         Initialize the audio recorder.
         
         Args:
             sample_rate (int): Sample rate for recording (default: 16000 Hz, optimal for Whisper)
             channels (int): Number of audio channels (default: 1 for mono)
+            max_interactive_seconds (float): Longest recording kept by
+                `record_audio_interactive` (default: 60 seconds)
         """
         self.sample_rate = sample_rate
         self.channels = channels
         self.recording = False
         self.audio_data: List[np.ndarray] = []
+        self.max_interactive_seconds = max_interactive_seconds
+        # Preallocated on the first interactive recording and reused afterwards
+        self._interactive_buffer: Optional[np.ndarray] = None
     
     def record_audio(self, duration: float = 5.0, countdown: bool = True) -> str:
         """
@@ -55,12 +63,22 @@ class AudioRecorder:
         Returns:
             str: Path to the temporary WAV file containing the recorded audio
         """
+        return self.save_temp_wav(self.record_audio_array(duration, countdown))
+    
+    def record_audio_array(self, duration: float = 5.0, countdown: bool = True) -> np.ndarray:
+        """
+        Record audio from the microphone and return it in memory.
+        
+        Args:
+            duration (float): Recording duration in seconds (default: 5.0)
+            countdown (bool): Whether to show a countdown before recording
+            
+        Returns:
+            np.ndarray: Float32 samples in the range [-1, 1] at `sample_rate`,
+                        one-dimensional for mono recordings
+        """
         if countdown:
-            print("\n🎤 準備開始錄音...")
-            print("請在聽到提示音後開始說話")
-            for i in range(3, 0, -1):
-                print(f"⏰ {i}...")
-                sd.sleep(1000)  # Sleep for 1 second
+            self._countdown()
         
         print(f"🔴 開始錄音 ({duration} 秒)...")
         
@@ -77,15 +95,9 @@ class AudioRecorder:
         
         print("✅ 錄音完成！")
         
-        # Create temporary file
-        temp_file = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-        temp_path = temp_file.name
-        temp_file.close()
-        
-        # Save as WAV file
-        self._save_wav(audio_data, temp_path)
-        
-        return temp_path
+        if self.channels == 1:
+            return audio_data.reshape(-1)
+        return audio_data
     
     def record_audio_interactive(self) -> str:
         """
@@ -101,13 +113,23 @@ class AudioRecorder:
         print("🔴 開始錄音...")
         print("按 Enter 停止錄音...")
         
-        # Start recording in a separate thread
-        audio_data: List[np.ndarray] = []
+        # Chunks are written straight into one preallocated buffer, so the
+        # audio thread does not allocate and no final concatenation is needed
+        if self._interactive_buffer is None:
+            max_frames = int(self.max_interactive_seconds * self.sample_rate)
+            self._interactive_buffer = np.empty((max_frames, self.channels), dtype=np.float32)
+        buffer = self._interactive_buffer
+        write_pos = 0
+        last_status: Any = None
         
         def audio_callback(indata: np.ndarray, frames: int, time: Any, status: Any) -> None:
+            # Runs on PortAudio's real-time thread: no allocation or console I/O
+            nonlocal write_pos, last_status
             if status:
-                print(f"錄音狀態: {status}")
-            audio_data.append(indata.copy())
+                last_status = status
+            n = min(frames, buffer.shape[0] - write_pos)
+            buffer[write_pos:write_pos + n] = indata[:n]
+            write_pos += n
         
         # Start recording
         with sd.InputStream(
@@ -119,23 +141,45 @@ class AudioRecorder:
             input()  # Wait for user to press Enter
         
         print("✅ 錄音完成！")
+        if last_status:
+            print(f"錄音狀態: {last_status}")
         
-        if not audio_data:
+        if write_pos == 0:
             raise RuntimeError("沒有錄製到音頻數據")
+        if write_pos == buffer.shape[0]:
+            print(f"⚠️ 錄音超過 {self.max_interactive_seconds} 秒，超出部分已被捨棄")
         
-        # Concatenate all audio chunks
-        full_audio: np.ndarray = np.concatenate(audio_data, axis=0)
+        # The WAV file is written immediately, so a view into the reused buffer is safe
+        return self.save_temp_wav(buffer[:write_pos])
+    
+    def save_temp_wav(self, audio_data: np.ndarray) -> str:
+        """
+        Save audio data to a new temporary WAV file.
         
-        # Create temporary file
+        Args:
+            audio_data (np.ndarray): Float32 audio data in the range [-1, 1]
+            
+        Returns:
+            str: Path to the temporary WAV file (caller is responsible for cleanup)
+        """
         temp_file = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
         temp_path = temp_file.name
         temp_file.close()
         
-        # Save as WAV file
-        self._save_wav(full_audio, temp_path)
+        self._save_wav(audio_data, temp_path)
         
         return temp_path
     
+    def _countdown(self) -> None:
+        """
+        Show a short countdown so the user knows when to start speaking.
+        """
+        print("\n🎤 準備開始錄音...")
+        print("請在聽到提示音後開始說話")
+        for i in range(3, 0, -1):
+            print(f"⏰ {i}...")
+            sd.sleep(1000)  # Sleep for 1 second
+    
     def _save_wav(self, audio_data: np.ndarray, file_path: str) -> None:
         """
         Save audio data as a WAV file.
@@ -144,8 +188,11 @@ class AudioRecorder:
             audio_data (np.ndarray): Audio data to save
             file_path (str): Path where to save the WAV file
         """
-        # Convert float32 to int16
-        audio_int16 = (audio_data * 32767).astype(np.int16)
+        # Convert float32 to int16. Scaling and clipping reuse one float32
+        # buffer, and clipping keeps overdriven samples from wrapping around.
+        scaled = np.multiply(audio_data, 32767.0, dtype=np.float32)
+        np.clip(scaled, -32768.0, 32767.0, out=scaled)
+        audio_int16 = scaled.astype(np.int16)
         
         with wave.open(file_path, 'w') as wav_file:
             wav_file.setnchannels(self.channels)
@@ -153,18 +200,20 @@ class AudioRecorder:
             wav_file.setframerate(self.sample_rate)
             wav_file.writeframes(audio_int16.tobytes())
     
-    def cleanup_temp_file(self, file_path: str) -> None:
+    @staticmethod
+    def cleanup_temp_file(file_path: str) -> None:
         """
-        Clean up temporary audio file.
+        Clean up temporary audio file. Files that are already gone are ignored.
         
         Args:
             file_path (str): Path to the temporary file to delete
         """
         try:
-            if os.path.exists(file_path):
-                os.unlink(file_path)
-                print(f"🗑️ 清理暫存檔案: {os.path.basename(file_path)}")
-        except Exception as e:
+            os.unlink(file_path)
+            print(f"🗑️ 清理暫存檔案: {os.path.basename(file_path)}")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
             print(f"⚠️ 清理檔案時發生錯誤: {e}")
     
     @staticmethod
@@ -176,4 +225,68 @@ class AudioRecorder:
         devices = sd.query_devices()
         for i, device in enumerate(devices):
             if device['max_input_channels'] > 0:
-                print(f"  {i}: {device['name']} (輸入: {device['max_input_channels']} 聲道)")
\ No newline at end of file
+                print(f"  {i}: {device['name']} (輸入: {device['max_input_channels']} 聲道)")
+
+class StreamingRecorder(AudioRecorder):
+    """
+    Records audio from the microphone and delivers it in fixed-size chunks.
+    
+    Unlike `AudioRecorder.record_audio`, which only returns once the whole
+    recording window has elapsed, this class yields each chunk as soon as it
+    has been captured. Consumers (e.g. a streaming ASR worker) can therefore
+    process the beginning of an utterance while the user is still speaking.
+    """
+    
+    def __init__(self, sample_rate: int = 16000, channels: int = 1, chunk_seconds: float = 1.0) -> None:
+        """
+        Initialize the streaming recorder.
+        
+        Args:
+            sample_rate (int): Sample rate for recording (default: 16000 Hz, optimal for Whisper)
+            channels (int): Number of audio channels (default: 1 for mono)
+            chunk_seconds (float): Length of each delivered chunk in seconds (default: 1.0)
+        """
+        super().__init__(sample_rate=sample_rate, channels=channels)
+        self.chunk_frames = int(chunk_seconds * sample_rate)
+    
+    def stream_audio(self, duration: float = 5.0, countdown: bool = True) -> Iterator[np.ndarray]:
+        """
+        Record audio from the microphone, yielding chunks as they are captured.
+        
+        The PortAudio callback only copies each block into a queue; the
+        consumer runs on the calling thread between chunks, so slow consumers
+        never cause dropped audio. Stream status warnings (e.g. overflows) are
+        reported from the consumer side, not from the real-time callback.
+        
+        Args:
+            duration (float): Recording duration in seconds (default: 5.0)
+            countdown (bool): Whether to show a countdown before recording
+            
+        Yields:
+            np.ndarray: Float32 audio chunks of shape (chunk_frames, channels)
+        """
+        if countdown:
+            self._countdown()
+        
+        chunks: "queue.Queue[tuple[np.ndarray, Any]]" = queue.Queue()
+        
+        def audio_callback(indata: np.ndarray, frames: int, time: Any, status: Any) -> None:
+            chunks.put((indata.copy(), status))
+        
+        total_chunks = math.ceil(duration * self.sample_rate / self.chunk_frames)
+        print(f"🔴 開始錄音 ({duration} 秒)...")
+        
+        with sd.InputStream(
+            callback=audio_callback,
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            dtype=np.float32,
+            blocksize=self.chunk_frames
+        ):
+            for _ in range(total_chunks):
+                chunk, status = chunks.get()
+                if status:
+                    print(f"錄音狀態: {status}")
+                yield chunk
+        
+        print("✅ 錄音完成！")
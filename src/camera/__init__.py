@@ -8,14 +8,20 @@ entry point, allowing the application to dynamically select a camera
 implementation (e.g., a physical RealSense camera or a mock/test camera).
 """
 
+import importlib
+from functools import lru_cache
 from typing import Any
 from .camera_interface import CameraInterface
-from .realsense_camera import RealsenseCamera
 
 def get_camera_service(service_name: str = "realsense", **kwargs: Any) -> CameraInterface:
     """
     Factory function to create and return an instance of a camera service.
 
+    Instances are cached per (service_name, kwargs), so repeated calls with
+    the same arguments return the same object and the device pipeline is
+    started only once per process. Calls with unhashable keyword arguments are
+    not cached; use `reset_cache` to drop cached instances.
+
     Args:
         service_name (str): The identifier for the desired camera service.
                             Supported values: "realsense".
@@ -29,10 +35,40 @@ def get_camera_service(service_name: str = "realsense", **kwargs: Any) -> Camera
     Raises:
         ValueError: If the specified `service_name` is not supported.
     """
+    try:
+        kwargs_key = tuple(sorted(kwargs.items()))
+        hash(kwargs_key)
+    except TypeError:
+        # Unhashable arguments (e.g., a list) cannot form a cache key.
+        return _create_camera_service(service_name, **kwargs)
+    return _get_cached_camera_service(service_name, kwargs_key)
+
+@lru_cache(maxsize=None)
+def _get_cached_camera_service(service_name: str, kwargs_key: tuple) -> CameraInterface:
+    """
+    Creates the camera service for a hashable (service_name, sorted kwargs) key, once.
+    """
+    return _create_camera_service(service_name, **dict(kwargs_key))
+
+def _create_camera_service(service_name: str, **kwargs: Any) -> CameraInterface:
+    """
+    Instantiates the requested camera service without caching.
+    """
     if service_name == "realsense":
+        # Imported on demand: pyrealsense2 is slow to import, and fails
+        # outright on machines without the RealSense driver.
+        RealsenseCamera = importlib.import_module(".realsense_camera", __package__).RealsenseCamera
         return RealsenseCamera(**kwargs)
     else:
         raise ValueError(f"Unsupported camera service: '{service_name}'")
 
+def reset_cache() -> None:
+    """
+    Drops all cached camera service instances, so the next
+    `get_camera_service` call creates a new one. Call it after `release()` on
+    a cached camera; callers remain responsible for releasing old instances.
+    """
+    _get_cached_camera_service.cache_clear()
+
 # Expose the core components for easy import.
-__all__ = ["CameraInterface", "get_camera_service"]
+__all__ = ["CameraInterface", "get_camera_service", "reset_cache"]
@@ -1,6 +1,6 @@
 # src/camera/camera_interface.py
 from abc import ABC, abstractmethod
-from PIL import Image
+import numpy as np
 
 class CameraInterface(ABC):
     """
@@ -13,12 +13,16 @@ class CameraInterface(ABC):
     """
 
     @abstractmethod
-    def get_frame(self) -> Image.Image:
+    def get_frame(self) -> np.ndarray:
         """
         Captures and returns a single frame from the camera.
 
+        Frames are returned as arrays so that consumers which need raw pixels
+        do not pay for a PIL round trip; wrap with `Image.fromarray` where a
+        PIL Image is required.
+
         Returns:
-            Image.Image: A PIL (Pillow) Image object representing the captured frame.
+            np.ndarray: The captured frame as an (height, width, 3) uint8 RGB array.
 
         Raises:
             RuntimeError: If a frame cannot be captured from the camera source.
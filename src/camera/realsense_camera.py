@@ -1,7 +1,8 @@
 # src/camera/realsense_camera.py
 import pyrealsense2 as rs
 import numpy as np
-from PIL import Image
+import threading
+from typing import Any, Optional
 from .camera_interface import CameraInterface
 
 class RealsenseCamera(CameraInterface):
@@ -10,17 +11,26 @@ class RealsenseCamera(CameraInterface):
 
     This class manages the connection to a RealSense device, configures the
     color stream, and captures frames for the application.
+
+    Frames are pulled continuously by a background capture thread, so
+    `get_frame` returns the most recent frame immediately instead of blocking
+    on the device. The pipeline delivers into a single-slot `rs.frame_queue`,
+    so the SDK drops stale frames itself and Python never wraps them.
+    `frame_queue.wait_for_frame` releases the GIL, so the capture thread runs
+    concurrently with the rest of the application.
     """
 
-    def __init__(self, width: int = 640, height: int = 480, fps: int = 30) -> None:
+    def __init__(self, width: int = 640, height: int = 480, fps: int = 30, first_frame_timeout: float = 5.0) -> None:
         """
-        Initializes the RealSense camera and starts the pipeline.
+        Initializes the RealSense camera, starts the pipeline and the capture thread.
 
         Args:
             width (int): The desired width of the color stream.
             height (int): The desired height of the color stream.
             fps (int): The desired frames per second of the color stream.
-        
+            first_frame_timeout (float): How long `get_frame` waits for the first
+                                         frame after start-up, in seconds.
+
         Raises:
             RuntimeError: If the camera fails to initialize or start the pipeline.
         """
@@ -28,37 +38,90 @@ class RealsenseCamera(CameraInterface):
             self.pipeline = rs.pipeline()
             config = rs.config()
             config.enable_stream(rs.stream.color, width, height, rs.format.bgr8, fps)
-            self.pipeline.start(config)
+            # Keep only the newest frameset at the C++ level
+            self._frame_queue = rs.frame_queue(1, keep_frames=False)
+            self.pipeline.start(config, self._frame_queue)
             print("RealSense Camera initialized.")
         except Exception as e:
             print(f"Failed to initialize RealSense Camera: {e}")
             raise
 
-    def get_frame(self) -> Image.Image:
+        self.first_frame_timeout = first_frame_timeout
+        # Single-slot buffer holding the newest color frame from the capture thread.
+        # It is converted to RGB lazily, and only once per frame.
+        self._frame_lock = threading.Lock()
+        self._frame_available = threading.Event()
+        self._latest_frame: Optional[Any] = None
+        self._latest_frame_number = -1
+        self._converted_frame_number = -1
+        self._converted_image: Optional[np.ndarray] = None
+
+        self._stop_event = threading.Event()
+        self._capture_thread = threading.Thread(target=self._capture_loop, name="realsense-capture", daemon=True)
+        self._capture_thread.start()
+
+    def _capture_loop(self) -> None:
+        """
+        Continuously pulls frames into the latest-frame slot until released.
+        This method should only be called by the capture thread.
+        """
+        while not self._stop_event.is_set():
+            try:
+                frames = self._frame_queue.wait_for_frame(1000).as_frameset()
+            except RuntimeError as e:
+                if not self._stop_event.is_set():
+                    print(f"RealSense Camera: Frame capture failed, retrying: {e}")
+                continue
+
+            color_frame = frames.get_color_frame()
+            if not color_frame:
+                continue
+            with self._frame_lock:
+                self._latest_frame = color_frame
+                self._latest_frame_number = color_frame.get_frame_number()
+            self._frame_available.set()
+
+    def get_frame(self) -> np.ndarray:
         """
-        Waits for and retrieves a color frame from the RealSense pipeline.
+        Returns the most recent color frame captured by the background thread.
+
+        Only the first call after start-up waits for the device; later calls
+        return immediately. Calling again before a new frame has arrived
+        returns the same array.
 
         Returns:
-            Image.Image: A PIL Image object in RGB format.
+            np.ndarray: A C-contiguous (height, width, 3) uint8 RGB array. Each
+                        new frame gets its own array, so it stays valid after
+                        later calls. It is shared between callers and therefore
+                        read-only.
 
         Raises:
-            RuntimeError: If a color frame could not be obtained from the device.
+            RuntimeError: If no color frame has been received from the device.
         """
-        frames = self.pipeline.wait_for_frames()
-        color_frame = frames.get_color_frame()
-        if not color_frame:
+        if not self._frame_available.wait(timeout=self.first_frame_timeout):
             raise RuntimeError("Could not get color frame from RealSense camera.")
-        
-        # Convert the image from BGR (used by RealSense) to RGB format.
-        color_image = np.asanyarray(color_frame.get_data())
-        color_image_rgb = color_image[:, :, ::-1]  # BGR to RGB
-        
-        return Image.fromarray(color_image_rgb)
+
+        with self._frame_lock:
+            if self._converted_frame_number != self._latest_frame_number:
+                # Wrap the frame's memory without copying, then swap BGR (used by
+                # RealSense) to RGB in a single pass into a contiguous array. This
+                # is the only copy made; no PIL image is built.
+                color_image = np.asanyarray(self._latest_frame.get_data())
+                rgb_image = np.empty_like(color_image)
+                np.copyto(rgb_image, color_image[:, :, ::-1])
+                rgb_image.setflags(write=False)
+                self._converted_image = rgb_image
+                self._converted_frame_number = self._latest_frame_number
+            return self._converted_image
 
     def release(self) -> None:
         """
-        Stops the RealSense pipeline to release the camera hardware.
+        Stops the capture thread and the RealSense pipeline to release the camera hardware.
         """
         print("Stopping RealSense camera pipeline...")
+        self._stop_event.set()
+        self._capture_thread.join(timeout=2.0)
+        with self._frame_lock:
+            self._latest_frame = None
         self.pipeline.stop()
-        print("RealSense Camera stopped.")
\ No newline at end of file
+        print("RealSense Camera stopped.")
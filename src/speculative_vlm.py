@@ -0,0 +1,172 @@
+"""
+Speculative VLM requests for the VLM-Enhanced Robot Assistant.
+
+With streaming ASR, a partial transcript is available before the user has
+finished speaking. This module fires the VLM request for that partial
+transcript right away, so the network round trip overlaps the tail of the
+recording and transcription. When the final transcript arrives, the
+speculative answer is used only if the text it was based on is the final
+text (ignoring case, whitespace and punctuation); otherwise it is discarded
+and the caller queries the VLM again. Near matches are never reused: an
+inserted "不要" or a swapped "左"/"右" changes the command while keeping the
+texts highly similar.
+
+Classes:
+    SpeculativeDecision: Issues and validates a single speculative VLM request
+"""
+
+import time
+import unicodedata
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional, Union
+
+from PIL import Image
+
+from src.vlm import VLMInterface
+
+
+def _normalize(text: str) -> str:
+    """
+    Returns `text` without whitespace or punctuation, case-folded, so that a
+    partial transcript lacking the final "。" still matches the final one.
+    """
+    return "".join(c for c in text.casefold() if not c.isspace() and not unicodedata.category(c).startswith("P"))
+
+
+class SpeculativeDecision:
+    """
+    Issues at most one speculative VLM request per interaction.
+
+    `on_partial` is meant to be registered as the streaming transcriber's
+    partial-transcript callback. The first partial transcript that is long
+    enough triggers a VLM request on a background worker. `response_for`
+    then decides, based on the final transcript, whether that request's
+    answer can be used.
+    """
+
+    def __init__(
+        self,
+        vlm: VLMInterface,
+        build_prompt: Callable[[str], str],
+        response_schema: Optional[Dict[str, Any]] = None,
+        min_chars: int = 6,
+    ) -> None:
+        """
+        Initializes the speculative request helper.
+
+        Args:
+            vlm (VLMInterface): The VLM service to query.
+            build_prompt (Callable[[str], str]): Builds the final prompt from an
+                instruction text.
+            response_schema (Optional[Dict[str, Any]]): Passed through to
+                `VLMInterface.get_decision`.
+            min_chars (int): Minimum length of a partial transcript (ignoring
+                whitespace) before a request is sent. Each CJK character counts
+                as one, so this is roughly a word count for Chinese.
+        """
+        self.vlm = vlm
+        self.build_prompt = build_prompt
+        self.response_schema = response_schema
+        self.min_chars = min_chars
+
+        self._image_future: Optional["Future[Union[Image.Image, bytes]]"] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculative-vlm")
+        self._speculative_text: Optional[str] = None
+        self._sent_at = 0.0
+        self._response_future: Optional["Future[str]"] = None
+
+    def attach_image(self, image_future: "Future[Union[Image.Image, bytes]]") -> None:
+        """
+        Provides the (possibly still loading) image the request will use.
+
+        Args:
+            image_future (Future[Union[Image.Image, bytes]]): Resolves to the
+                VLM-ready image or its JPEG encoding.
+        """
+        self._image_future = image_future
+
+    def on_partial(self, partial_text: str) -> None:
+        """
+        Sends the speculative request once the partial transcript is long enough.
+
+        Args:
+            partial_text (str): The transcript of all completed segments so far.
+        """
+        if self._response_future is not None or self._image_future is None:
+            return
+        if len("".join(partial_text.split())) < self.min_chars:
+            return
+
+        print(f"Speculative VLM: Sending request for partial transcript '{partial_text}'")
+        self._speculative_text = partial_text
+        self._sent_at = time.monotonic()
+        self._response_future = self._executor.submit(self._request, partial_text)
+
+    def response_for(self, final_text: str, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Returns the speculative response if it matches the final transcript.
+
+        When the response is used, blocks until the speculative request
+        completes, but no longer than `timeout` seconds after it was sent.
+        A request that fails or runs out of time is treated like a
+        mismatch, so the caller falls back to a regular request.
+
+        Args:
+            final_text (str): The final transcript of the user's command.
+            timeout (Optional[float]): Time budget of the speculative request,
+                counted from when it was sent. None waits indefinitely.
+
+        Returns:
+            Optional[str]: The VLM's raw response, or None if no usable
+                           speculative response is available.
+        """
+        self._executor.shutdown(wait=False)
+        if self._response_future is None:
+            return None
+
+        if not self.matches(final_text):
+            print(f"Speculative VLM: Discarded (request was for '{self._speculative_text}')")
+            self.cancel()
+            return None
+
+        remaining = None if timeout is None else max(0.0, timeout - (time.monotonic() - self._sent_at))
+        try:
+            response = self._response_future.result(timeout=remaining)
+        except FutureTimeoutError:
+            print(f"Speculative VLM: Discarded (no response within {timeout:.1f}s)")
+            self.cancel()
+            return None
+        except Exception as e:
+            print(f"Speculative VLM: Discarded (request failed: {e})")
+            return None
+        print("Speculative VLM: Reusing speculative response")
+        return response
+
+    def matches(self, final_text: str) -> bool:
+        """
+        Returns whether the speculative request was made for exactly the final
+        transcript, ignoring case, whitespace and punctuation.
+
+        Args:
+            final_text (str): The final transcript of the user's command.
+
+        Returns:
+            bool: True if the speculative response answers `final_text`.
+        """
+        return self._speculative_text is not None and _normalize(self._speculative_text) == _normalize(final_text)
+
+    def cancel(self) -> None:
+        """
+        Cancels a pending speculative request. A request already in flight is
+        left to finish in the background and its result is ignored.
+        """
+        if self._response_future is not None:
+            self._response_future.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _request(self, instruction_text: str) -> str:
+        """
+        Runs the VLM request on the background worker.
+        """
+        image = self._image_future.result()
+        return self.vlm.get_decision(self.build_prompt(instruction_text), image, response_schema=self.response_schema)
@@ -0,0 +1,161 @@
+"""
+Streaming speech recognition for the VLM-Enhanced Robot Assistant.
+
+This module overlaps audio capture with transcription. Instead of recording
+the full command and only then handing it to the ASR model, audio is split
+into short segments while it is being recorded, and each completed segment
+is transcribed on a background worker. By the time the user stops speaking,
+only the final segment is left to transcribe.
+
+Classes:
+    StreamingTranscriber: Feeds recorded chunks to an ASR service segment by segment
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from src.asr import ASRInterface
+from src.audio_recorder import StreamingRecorder
+
+
+class StreamingTranscriber:
+    """
+    Transcribes a live recording segment by segment while it is captured.
+
+    Chunks from a `StreamingRecorder` are accumulated into a segment. Once a
+    segment reaches `segment_seconds`, it is closed at the next quiet chunk
+    (or forcibly at twice that length) so that cuts tend to fall between
+    words, and is submitted to a single background worker. Segments that are
+    entirely silent are skipped, which also avoids Whisper's tendency to
+    hallucinate text on silence.
+
+    Note:
+        `ASRInterface.transcribe` returns plain text without word timestamps,
+        so segments are transcribed independently and concatenated rather
+        than re-decoded with a rolling overlap.
+    """
+
+    def __init__(
+        self,
+        asr: ASRInterface,
+        recorder: Optional[StreamingRecorder] = None,
+        segment_seconds: float = 3.0,
+        silence_rms: float = 0.01,
+        on_partial: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        """
+        Initializes the streaming transcriber.
+
+        Args:
+            asr (ASRInterface): The ASR service used to transcribe each segment.
+            recorder (Optional[StreamingRecorder]): The chunked recorder to read
+                from. A default 16 kHz mono recorder is created if omitted.
+            segment_seconds (float): Target segment length before a cut is attempted.
+            silence_rms (float): RMS level below which a chunk counts as silence.
+            on_partial (Optional[Callable[[str], None]]): Called from the worker
+                thread with the transcript of all completed segments so far.
+        """
+        self.asr = asr
+        self.recorder = recorder or StreamingRecorder()
+        self.segment_seconds = segment_seconds
+        self.silence_rms = silence_rms
+        self.on_partial = on_partial
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="streaming-asr")
+        self._segment_futures: List["Future[str]"] = []
+        self._pending: List[np.ndarray] = []
+        self._pending_frames = 0
+        self._transcripts: List[str] = []
+
+    def transcribe_live(self, duration: float = 5.0, countdown: bool = True) -> "Future[str]":
+        """
+        Records for `duration` seconds while transcribing completed segments.
+
+        This call blocks for the recording window only. The returned future
+        resolves once the final segment has been transcribed.
+
+        Args:
+            duration (float): Recording duration in seconds.
+            countdown (bool): Whether to show a countdown before recording.
+
+        Returns:
+            Future[str]: The full transcript of the recording.
+        """
+        try:
+            for chunk in self.recorder.stream_audio(duration=duration, countdown=countdown):
+                self._feed(chunk)
+        except BaseException:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        return self._finish()
+
+    def _feed(self, chunk: np.ndarray) -> None:
+        """
+        Appends a recorded chunk and closes the current segment when due.
+
+        Args:
+            chunk (np.ndarray): A float32 audio chunk from the recorder.
+        """
+        self._pending.append(chunk)
+        self._pending_frames += chunk.shape[0]
+
+        pending_seconds = self._pending_frames / self.recorder.sample_rate
+        if pending_seconds < self.segment_seconds:
+            return
+        if self._is_silent(chunk) or pending_seconds >= 2 * self.segment_seconds:
+            self._submit_pending()
+
+    def _finish(self) -> "Future[str]":
+        """
+        Submits the remaining audio and returns a future for the full transcript.
+        """
+        self._submit_pending()
+        segment_futures = list(self._segment_futures)
+
+        def join_segments() -> str:
+            # The worker is single-threaded, so every earlier segment has
+            # already finished by the time this job runs.
+            return "".join(future.result() for future in segment_futures).strip()
+
+        transcript_future = self._executor.submit(join_segments)
+        self._executor.shutdown(wait=False)
+        return transcript_future
+
+    def _submit_pending(self) -> None:
+        """
+        Hands the accumulated segment to the background worker.
+        """
+        if not self._pending:
+            return
+        segment = np.concatenate(self._pending, axis=0)
+        self._pending = []
+        self._pending_frames = 0
+
+        if self._is_silent(segment):
+            return
+        self._segment_futures.append(self._executor.submit(self._transcribe_segment, segment))
+
+    def _transcribe_segment(self, segment: np.ndarray) -> str:
+        """
+        Transcribes a single segment on the worker thread.
+
+        Args:
+            segment (np.ndarray): The float32 audio of one segment.
+
+        Returns:
+            str: The segment's transcript.
+        """
+        text = self.asr.transcribe_array(segment.reshape(-1), self.recorder.sample_rate).strip()
+
+        self._transcripts.append(text)
+        if self.on_partial:
+            self.on_partial("".join(self._transcripts))
+        return text
+
+    def _is_silent(self, audio: np.ndarray) -> bool:
+        """
+        Checks whether the audio's RMS level is below the silence threshold.
+        """
+        return float(np.sqrt(np.mean(np.square(audio)))) < self.silence_rms
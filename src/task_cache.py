@@ -0,0 +1,142 @@
+# src/task_cache.py
+"""
+Plan cache for the VLM-Enhanced Robot Assistant.
+
+Operators often repeat the same command against a scene that has barely
+changed. This module caches task plans keyed by the normalized command and a
+perceptual hash (pHash) of the scene, so such repeats can skip the VLM call.
+Two scenes match when their pHashes differ in only a few bits, which absorbs
+sensor noise and small lighting changes between frames.
+
+Classes:
+    TaskCache: LRU cache of plans keyed by (command, perceptual image hash)
+
+Functions:
+    perceptual_hash: Computes a 64-bit DCT-based perceptual hash of an image
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+_HASH_SIZE = 8
+_SAMPLE_SIZE = 32
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """
+    Returns the orthonormal DCT-II matrix of size n x n.
+    """
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+_DCT = _dct_matrix(_SAMPLE_SIZE)
+
+
+def perceptual_hash(image: Union[Image.Image, np.ndarray]) -> int:
+    """
+    Computes a 64-bit perceptual hash of an image.
+
+    The image is reduced to 32x32 grayscale and transformed with a 2-D DCT.
+    Each of the 8x8 lowest-frequency coefficients contributes one bit, set
+    when the coefficient is above the median of that block.
+
+    Args:
+        image (Union[Image.Image, np.ndarray]): The image, as a PIL Image or an
+            (height, width, 3) uint8 RGB array.
+
+    Returns:
+        int: The hash as a 64-bit integer.
+    """
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    small = image.convert("L").resize((_SAMPLE_SIZE, _SAMPLE_SIZE), Image.Resampling.BILINEAR)
+    pixels = np.asarray(small, dtype=np.float64)
+    coefficients = (_DCT @ pixels @ _DCT.T)[:_HASH_SIZE, :_HASH_SIZE]
+    bits = (coefficients > np.median(coefficients)).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+class TaskCache:
+    """
+    A thread-safe LRU cache of task plans keyed by command and scene.
+
+    A lookup first tries an exact (command, pHash) match, then falls back to
+    any entry for the same command whose pHash is within `max_distance` bits.
+    """
+
+    def __init__(self, max_entries: int = 256, max_distance: int = 5) -> None:
+        """
+        Initializes an empty cache.
+
+        Args:
+            max_entries (int): Number of plans kept before the least recently
+                               used one is evicted.
+            max_distance (int): Largest Hamming distance between two pHashes
+                                for their scenes to count as the same.
+        """
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self._entries: "OrderedDict[Tuple[str, int], List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, int]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Returns a copy of the cached plan for a matching command and scene.
+
+        Args:
+            key (Tuple[str, int]): The key from `key`.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: The plan, or None on a miss.
+        """
+        task_hash, image_hash = key
+        with self._lock:
+            match = key if key in self._entries else None
+            if match is None:
+                for cached_key in reversed(self._entries):
+                    cached_task_hash, cached_image_hash = cached_key
+                    if cached_task_hash == task_hash and bin(cached_image_hash ^ image_hash).count("1") <= self.max_distance:
+                        match = cached_key
+                        break
+            if match is None:
+                return None
+            self._entries.move_to_end(match)
+            return [dict(step) for step in self._entries[match]]
+
+    def put(self, key: Tuple[str, int], plan: List[Dict[str, Any]]) -> None:
+        """
+        Stores a plan, evicting the least recently used entry when full.
+
+        Args:
+            key (Tuple[str, int]): The key from `key`.
+            plan (List[Dict[str, Any]]): The plan to cache. A copy is stored.
+        """
+        with self._lock:
+            self._entries[key] = [dict(step) for step in plan]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def key(task: str, image: Union[Image.Image, np.ndarray]) -> Tuple[str, int]:
+        """
+        Builds the cache key for a command and scene.
+
+        Args:
+            task (str): The user's command. Case and surrounding whitespace are ignored.
+            image (Union[Image.Image, np.ndarray]): The scene.
+
+        Returns:
+            Tuple[str, int]: The command hash and the scene's perceptual hash.
+        """
+        task_hash = hashlib.sha1(task.strip().lower().encode("utf-8")).hexdigest()
+        return task_hash, perceptual_hash(image)
@@ -1,9 +1,96 @@
 # src/task_decomposer.py
+import asyncio
+import json
+import re
 from PIL import Image
-from typing import List, Dict, Any
-import xml.etree.ElementTree as ET
+from concurrent.futures import Future
+from typing import List, Dict, Any, Optional, Tuple
 
-from vlm.vlm_interface import VLMInterface
+# lxml parses in C and is preferred; the standard library parser is the fallback.
+try:
+    from lxml import etree as ET
+    _XML_PARSER = ET.XMLParser(resolve_entities=False, no_network=True)
+    _XMLParseError = ET.XMLSyntaxError
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _XML_PARSER = None
+    _XMLParseError = ET.ParseError
+
+from vlm.vlm_interface import VLMInterface, _get_request_loop
+from vlm.batcher import VLMBatcher
+from vlm.image_utils import prepare_image
+from task_cache import TaskCache
+
+# The prompt template for the VLM. It is engineered to instruct the VLM to act
+# as a robot task planner and to return its plan as a JSON array of steps.
+_PROMPT_TEMPLATE = """You are a professional robot task planning assistant. Your duty is to break down complex user commands into a series of simple, concrete, atomic steps, based on the current visual scene.
+
+Please strictly follow the output format below. Do not add any extra explanations or text.
+
+**Output Format:**
+A JSON array with one object per step, in execution order:
+[
+  {"action": "[ACTION_TYPE]", "target": "[TARGET_OBJECT_DESCRIPTION]", "reason": "[BRIEF_REASON_FOR_THIS_STEP]"},
+  {"action": "[ACTION_TYPE]", "target": "[TARGET_OBJECT_DESCRIPTION]", "reason": "[BRIEF_REASON_FOR_THIS_STEP]"}
+]
+
+**Available [ACTION_TYPE]s:**
+- **MOVE_TO**: Move to an object or location.
+- **PICK**: Pick up an object.
+- **PLACE**: Place the held object somewhere.
+- **SCAN**: Scan the environment to find an object or confirm a state.
+- **WAIT**: Wait or pause.
+- **ASK_CLARIFICATION**: Ask the user a question when the command is ambiguous or there are multiple possible targets.
+
+---
+**Example:**
+
+# User Command: \"put that apple in the bowl\"
+# Visual Scene: (An image showing a red apple and a white bowl on a table)
+
+# Your Output:
+[
+  {"action": "MOVE_TO", "target": "the red apple", "reason": "First, I need to move to the target apple."},
+  {"action": "PICK", "target": "the red apple", "reason": "Pick up the specified apple."},
+  {"action": "MOVE_TO", "target": "the white bowl", "reason": "Move to the destination for placement."},
+  {"action": "PLACE", "target": "the white bowl", "reason": "Place the apple in the bowl to complete the task."}
+]
+
+---
+**Now, perform the task based on the following information:**
+
+# User Command: "{user_task}"
+# Visual Scene: (The image content will be provided by the API)
+
+# Your Output:
+"""
+
+# The template has a single substitution point, so it is split around it once
+# at import and each prompt is built by concatenation instead of str.format.
+_PROMPT_PREFIX, _PROMPT_SUFFIX = _PROMPT_TEMPLATE.split("{user_task}")
+
+# Content of a markdown code block (```, ```xml or ```json) around a response.
+_CODE_FENCE_RE = re.compile(r"```(?:xml|json)?\s*(.*?)```", re.DOTALL)
+
+# Response schema for a plan. Backends with a JSON mode (Gemini, local Qwen-VL) are
+# constrained to it, so their output is decoded with json.loads and needs no
+# cleanup. The step number is assigned from the array position.
+_PLAN_SCHEMA: Dict[str, Any] = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "action": {
+                "type": "STRING",
+                "format": "enum",
+                "enum": ["MOVE_TO", "PICK", "PLACE", "SCAN", "WAIT", "ASK_CLARIFICATION"],
+            },
+            "target": {"type": "STRING"},
+            "reason": {"type": "STRING"},
+        },
+        "required": ["action", "target", "reason"],
+    },
+}
 
 class TaskDecomposer:
     """
@@ -16,7 +103,7 @@ class TaskDecomposer:
     by a robotic system.
     """
 
-    def __init__(self, vlm_service: VLMInterface):
+    def __init__(self, vlm_service: VLMInterface, cache: Optional[TaskCache] = None):
         """
         Initializes the TaskDecomposer.
 
@@ -24,9 +111,14 @@ class TaskDecomposer:
             vlm_service (VLMInterface): An instance of a class that adheres to
                                         the VLMInterface, which will be used
                                         to get decisions from a VLM.
+            cache (Optional[TaskCache]): Cache of previous plans, so a repeated
+                                         command in a near-identical scene skips
+                                         the VLM. A new cache is created if omitted.
         """
         self.vlm_service = vlm_service
-        self._prompt_template = self._build_prompt_template()
+        self.cache = cache if cache is not None else TaskCache()
+        # Created on the first `decompose_task_async` call.
+        self._batcher: Optional[VLMBatcher] = None
         print("TaskDecomposer: Service initialized.")
 
     def decompose_task(self, user_task: str, image: Image.Image) -> List[Dict[str, Any]]:
@@ -34,7 +126,7 @@ class TaskDecomposer:
         Receives a user task and scene image, and returns decomposed steps.
 
         This method formats the prompt, sends it to the VLM service, and parses
-        the markup language response into a structured list of dictionaries.
+        the JSON response into a structured list of dictionaries.
 
         Args:
             user_task (str): The user's natural language command (e.g., "get me the apple from the table").
@@ -54,139 +146,222 @@ class TaskDecomposer:
             Exception: Propagates exceptions from the underlying VLM service.
         """
         print(f"TaskDecomposer: Decomposing task: '{user_task}'")
-        final_prompt = self._prompt_template.format(user_task=user_task)
+        # Prepared once here, the frame passes through the cache key and the
+        # VLM service without being converted again.
+        image = prepare_image(image)
+        cache_key = self.cache.key(user_task, image)
+        cached_steps = self.cache.get(cache_key)
+        if cached_steps is not None:
+            print("TaskDecomposer: Reusing cached plan for a matching task and scene.")
+            return cached_steps
+        final_prompt = self._build_prompt(user_task)
         
         try:
-            vlm_response = self.vlm_service.get_decision(text=final_prompt, image=image)
+            vlm_response = self.vlm_service.get_decision(text=final_prompt, image=image, response_schema=_PLAN_SCHEMA)
             print("TaskDecomposer: Received response from VLM.")
-            return self._parse_vlm_output(vlm_response)
+            steps = self._parse_vlm_output(vlm_response)
+            self.cache.put(cache_key, steps)
+            return steps
         except Exception as e:
             print(f"TaskDecomposer: An error occurred during task decomposition: {e}")
             raise
 
-    def _build_prompt_template(self) -> str:
+    def decompose_batch(self, tasks: List[Tuple[str, Image.Image]]) -> List[List[Dict[str, Any]]]:
         """
-        Builds and returns the prompt template for the VLM.
+        Decomposes several independent tasks with concurrent VLM requests.
+
+        Tasks found in the cache are answered immediately; the rest are sent
+        to the VLM service at the same time via `aget_decision`, so the batch
+        takes about as long as its slowest request.
 
-        This prompt is engineered to instruct the VLM to act as a robot task
-        planner and to return its plan in a specific XML-like format.
+        The requests run on the VLM services' shared request loop (the one
+        `VLMInterface.get_decision_within` uses) rather than a new loop per
+        call, since async clients such as Gemini's are bound to the loop
+        they were first used on.
+
+        Args:
+            tasks (List[Tuple[str, Image.Image]]): (user_task, image) pairs.
 
         Returns:
-            str: The complete prompt template string.
+            List[List[Dict[str, Any]]]: The step lists, in the order of `tasks`.
+
+        Raises:
+            ValueError: If any VLM response cannot be parsed correctly.
+            Exception: Propagates the first exception from the VLM service.
         """
-        return """You are a professional robot task planning assistant. Your duty is to break down complex user commands into a series of simple, concrete, atomic steps, based on the current visual scene.
+        print(f"TaskDecomposer: Decomposing batch of {len(tasks)} task(s).")
+        return asyncio.run_coroutine_threadsafe(self._decompose_all(tasks), _get_request_loop()).result()
 
-Please strictly follow the output format below. Do not add any extra explanations or text.
+    async def _decompose_all(self, tasks: List[Tuple[str, Image.Image]]) -> List[List[Dict[str, Any]]]:
+        """
+        Runs `_adecompose` for all tasks concurrently.
+        """
+        return list(await asyncio.gather(*(self._adecompose(user_task, image) for user_task, image in tasks)))
 
-**Output Format:**
-<plan>
-  <step>
-    <action>[ACTION_TYPE]</action>
-    <target>[TARGET_OBJECT_DESCRIPTION]</target>
-    <reason>[BRIEF_REASON_FOR_THIS_STEP]</reason>
-  </step>
-  <step>
-    <action>[ACTION_TYPE]</action>
-    <target>[TARGET_OBJECT_DESCRIPTION]</target>
-    <reason>[BRIEF_REASON_FOR_THIS_STEP]</reason>
-  </step>
-</plan>
+    async def _adecompose(self, user_task: str, image: Image.Image) -> List[Dict[str, Any]]:
+        """
+        Asynchronous, cache-aware counterpart of `decompose_task` for one task.
+        """
+        image = prepare_image(image)
+        cache_key = self.cache.key(user_task, image)
+        cached_steps = self.cache.get(cache_key)
+        if cached_steps is not None:
+            return cached_steps
+        vlm_response = await self.vlm_service.aget_decision(self._build_prompt(user_task), image, response_schema=_PLAN_SCHEMA)
+        steps = self._parse_vlm_output(vlm_response)
+        self.cache.put(cache_key, steps)
+        return steps
 
-**Available [ACTION_TYPE]s:**
-- **MOVE_TO**: Move to an object or location.
-- **PICK**: Pick up an object.
-- **PLACE**: Place the held object somewhere.
-- **SCAN**: Scan the environment to find an object or confirm a state.
-- **WAIT**: Wait or pause.
-- **ASK_CLARIFICATION**: Ask the user a question when the command is ambiguous or there are multiple possible targets.
+    def decompose_task_async(self, user_task: str, image: Image.Image) -> "Future[List[Dict[str, Any]]]":
+        """
+        Queues a task for decomposition and returns immediately.
 
----
-**Example:**
+        Requests submitted close together (e.g., by several operators) are
+        sent to the VLM service as one batch via `VLMBatcher`.
 
-# User Command: \"put that apple in the bowl\"
-# Visual Scene: (An image showing a red apple and a white bowl on a table)
+        Args:
+            user_task (str): The user's natural language command.
+            image (Image.Image): A PIL Image of the current scene.
 
-# Your Output:
-<plan>
-  <step>
-    <action>MOVE_TO</action>
-    <target>the red apple</target>
-    <reason>First, I need to move to the target apple.</reason>
-  </step>
-  <step>
-    <action>PICK</action>
-    <target>the red apple</target>
-    <reason>Pick up the specified apple.</reason>
-  </step>
-  <step>
-    <action>MOVE_TO</action>
-    <target>the white bowl</target>
-    <reason>Move to the destination for placement.</reason>
-  </step>
-  <step>
-    <action>PLACE</action>
-    <target>the white bowl</target>
-    <reason>Place the apple in the bowl to complete the task.</reason>
-  </step>
-</plan>
+        Returns:
+            Future[List[Dict[str, Any]]]: Resolves to the same step list as
+                `decompose_task`, or to the exception raised while getting or
+                parsing the VLM's response.
+        """
+        if self._batcher is None:
+            self._batcher = VLMBatcher(self.vlm_service, response_schema=_PLAN_SCHEMA)
 
----
-**Now, perform the task based on the following information:**
+        steps_future: "Future[List[Dict[str, Any]]]" = Future()
+        image = prepare_image(image)
+        cache_key = self.cache.key(user_task, image)
+        cached_steps = self.cache.get(cache_key)
+        if cached_steps is not None:
+            print(f"TaskDecomposer: Reusing cached plan for task: '{user_task}'")
+            steps_future.set_result(cached_steps)
+            return steps_future
 
-# User Command: "{user_task}"
-# Visual Scene: (The image content will be provided by the API)
+        print(f"TaskDecomposer: Queuing task for decomposition: '{user_task}'")
+        final_prompt = self._build_prompt(user_task)
 
-# Your Output:
-"""
+        def on_response(response_future: "Future[str]") -> None:
+            try:
+                steps = self._parse_vlm_output(response_future.result())
+                self.cache.put(cache_key, steps)
+                steps_future.set_result(steps)
+            except Exception as e:
+                steps_future.set_exception(e)
+
+        self._batcher.submit(final_prompt, image).add_done_callback(on_response)
+        return steps_future
+
+    def close(self) -> None:
+        """
+        Stops the background batcher, if one was started.
+        """
+        if self._batcher is not None:
+            self._batcher.close()
+            self._batcher = None
+
+    def _build_prompt(self, user_task: str) -> str:
+        """
+        Fills the user task into the prompt template.
+
+        Args:
+            user_task (str): The user's natural language command.
+
+        Returns:
+            str: The complete prompt for the VLM.
+        """
+        return _PROMPT_PREFIX + user_task + _PROMPT_SUFFIX
 
     def _parse_vlm_output(self, vlm_response: str) -> List[Dict[str, Any]]:
         """
-        Parses the XML-like string response from the VLM.
+        Parses the VLM's plan into a list of step dictionaries.
+
+        Backends in JSON mode return a bare JSON array, which is decoded
+        directly. Backends without a JSON mode may still answer in the legacy
+        <plan> XML format, which is handled by `_parse_xml_output`.
 
         Args:
-            vlm_response (str): The raw string response from the VLM, expected
-                                to be in the specified <plan> format.
+            vlm_response (str): The raw string response from the VLM.
 
         Returns:
             List[Dict[str, Any]]: A list of step dictionaries.
 
         Raises:
-            ValueError: If the response string is not valid XML or does not
-                        follow the expected structure.
+            ValueError: If the response is neither a valid JSON plan nor valid
+                        XML following the expected structure.
         """
         print("TaskDecomposer: Parsing VLM response...")
+        # Clean up potential markdown code blocks in a single scan
+        fence_match = _CODE_FENCE_RE.search(vlm_response)
+        if fence_match:
+            vlm_response = fence_match.group(1).strip()
+
+        if not vlm_response.lstrip().startswith('['):
+            return self._parse_xml_output(vlm_response)
+
         try:
-            # Clean up potential markdown code blocks
-            if '```xml' in vlm_response:
-                vlm_response = vlm_response.split('```xml')[1].split('```')[0].strip()
-            elif '```' in vlm_response:
-                 vlm_response = vlm_response.split('```')[1].split('```')[0].strip()
+            plan = json.loads(vlm_response)
+        except json.JSONDecodeError as e:
+            print(f"TaskDecomposer: Failed to parse JSON response. Error: {e}")
+            print(f"TaskDecomposer: Raw response was:\n---\n{vlm_response}\n---")
+            raise ValueError("Received malformed JSON response from VLM.")
 
+        steps = []
+        for i, step_node in enumerate(plan):
+            if not isinstance(step_node, dict):
+                raise ValueError(f"Plan step {i + 1} is not a JSON object.")
+            step_data = {'step': i + 1}
+            for field in ('action', 'target', 'reason'):
+                text = step_node.get(field)
+                if isinstance(text, str) and text:
+                    step_data[field] = text.strip()
+            steps.append(step_data)
 
-            root = ET.fromstring(vlm_response)
+        print(f"TaskDecomposer: Successfully parsed {len(steps)} steps.")
+        return steps
+
+    def _parse_xml_output(self, vlm_response: str) -> List[Dict[str, Any]]:
+        """
+        Parses the XML-like string response from the VLM.
+
+        Args:
+            vlm_response (str): The VLM's response with any code fence already
+                                removed, expected to be in the legacy <plan> format.
+
+        Returns:
+            List[Dict[str, Any]]: A list of step dictionaries.
+
+        Raises:
+            ValueError: If the response string is not valid XML or does not
+                        follow the expected structure.
+        """
+        # Refusals, apologies and API error text are rejected here, without
+        # running the XML parser and reporting a misleading parse error.
+        if not vlm_response.lstrip().startswith(('<plan', '<?xml')):
+            print(f"TaskDecomposer: VLM response is not a plan:\n---\n{vlm_response}\n---")
+            raise ValueError("VLM did not return a JSON or <plan> document.")
+
+        try:
+            root = ET.fromstring(vlm_response.encode('utf-8'), _XML_PARSER)
             if root.tag != 'plan':
                 raise ValueError("Root tag is not '<plan>'")
 
             steps = []
-            for i, step_node in enumerate(root.findall('step')):
+            for i, step_node in enumerate(root.iterfind('step')):
                 step_data = {'step': i + 1}
-                action = step_node.find('action')
-                target = step_node.find('target')
-                reason = step_node.find('reason')
-
-                if action is not None and action.text:
-                    step_data['action'] = action.text.strip()
-                if target is not None and target.text:
-                    step_data['target'] = target.text.strip()
-                if reason is not None and reason.text:
-                    step_data['reason'] = reason.text.strip()
+                for field in ('action', 'target', 'reason'):
+                    text = step_node.findtext(field)
+                    if text:
+                        step_data[field] = text.strip()
                 
                 steps.append(step_data)
             
             print(f"TaskDecomposer: Successfully parsed {len(steps)} steps.")
             return steps
 
-        except ET.ParseError as e:
+        except _XMLParseError as e:
             print(f"TaskDedecomposer: Failed to parse XML response. Error: {e}")
             print(f"TaskDecomposer: Raw response was:\n---\n{vlm_response}\n---")
             raise ValueError("Received malformed XML response from VLM.")
@@ -7,10 +7,14 @@ It is designed to be a simple, drop-in solution for adding voice capabilities
 to the application.
 
 The primary component is the `speak` function, which is exposed for direct use.
+For long text, `speak_stream` splits the text into sentences and starts
+playing the first one while the rest are still being synthesized.
+`speak_many` (and its coroutine form `aspeak_many`) does the same for a list
+of separate utterances.
 """
 
-from .tts_module import speak
+from .tts_module import aspeak_many, speak, speak_many, speak_stream
 
-# Expose the `speak` function as the public API of the `tts` package.
-# This allows other parts of the application to use it via `from src.tts import speak`.
-__all__ = ["speak"]
+# Expose the speech functions as the public API of the `tts` package.
+# This allows other parts of the application to use them via `from src.tts import speak`.
+__all__ = ["speak", "speak_stream", "speak_many", "aspeak_many"]
@@ -3,61 +3,350 @@ import asyncio
 import edge_tts
 from playsound import playsound
 import os
+import re
+import shutil
+import subprocess
 import tempfile
+import threading
+from typing import Any, Coroutine, List, Optional
+
+# miniaudio decodes and plays in-process through one reusable output device;
+# `playsound` is the fallback when it is not installed.
+try:
+    import miniaudio
+except ImportError:
+    miniaudio = None
 
 # Define the default voice for Text-to-Speech.
 # 'zh-TW-HsiaoChenNeural' is a high-quality female voice for Traditional Chinese (Taiwan).
 DEFAULT_VOICE = "zh-TW-HsiaoChenNeural"
 
-async def _generate_and_play(text: str, voice: str) -> None:
+# Sentence chunking for `speak_stream`: a chunk always ends at sentence-final
+# punctuation, and at a comma once it holds at least `_MIN_CLAUSE_WORDS` words.
+_SENTENCE_ENDINGS = ".?!。！？"
+_CLAUSE_ENDINGS = ",，、;；"
+_MIN_CLAUSE_WORDS = 4
+_CLAUSE_RE = re.compile(r"[^.?!。！？,，、;；]*(?:[.?!。！？,，、;；]+\s*|$)")
+_CJK_RE = re.compile(r"[\u3400-\u9fff\uf900-\ufaff]")
+
+# ffplay (from FFmpeg) can play MP3 from stdin while it is still being
+# synthesized. Without it, speech is saved to a temporary file and played
+# with `playsound` once complete.
+_FFPLAY = shutil.which("ffplay")
+_FFPLAY_ARGS = ["-nodisp", "-autoexit", "-loglevel", "quiet", "-i", "pipe:0"]
+
+# Shared miniaudio output device, opened on first playback.
+_playback_device: Optional[Any] = None
+_playback_lock = threading.Lock()
+
+# Extra time, beyond the clip's duration, to wait for miniaudio to report the
+# end of playback before giving up on it.
+_PLAYBACK_GRACE_SECONDS = 2.0
+
+# A single event loop on a daemon thread serves every `speak` call, so the
+# loop, its executor and its DNS cache are set up once instead of per call.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+def _get_loop() -> asyncio.AbstractEventLoop:
     """
-    An asynchronous helper function that generates speech and plays it.
+    Returns the shared TTS event loop, starting its thread on first use.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="tts-loop", daemon=True).start()
+        return _loop
+
+def _run(coro: Coroutine[Any, Any, None]) -> None:
+    """
+    Runs a coroutine on the shared TTS event loop and waits for it to finish.
+
+    Args:
+        coro (Coroutine[Any, Any, None]): The coroutine to run.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    try:
+        future.result()
+    except BaseException:
+        # E.g. Ctrl+C in the calling thread: stop the speech as well.
+        future.cancel()
+        raise
 
-    This function creates a temporary file to store the generated speech,
-    plays it using the `playsound` library, and ensures the temporary file
-    is cleaned up afterward.
+async def _synthesize(text: str, voice: str) -> str:
+    """
+    Synthesizes speech for `text` into a new temporary MP3 file.
 
     Args:
         text (str): The text to be synthesized into speech.
         voice (str): The voice to use for the synthesis.
+
+    Returns:
+        str: Path to the generated MP3 file. The caller must delete it.
     """
-    output_file: Optional[str] = None
+    # Using tempfile is safer and cleaner than hardcoding a filename.
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as fp:
+        output_file = fp.name
+
     try:
-        # Create a temporary file to store the MP3 output.
-        # Using tempfile is safer and cleaner than hardcoding a filename.
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as fp:
-            output_file = fp.name
-        
         print(f"TTS: Generating speech for: '{text}'")
         communicate = edge_tts.Communicate(text, voice)
         await communicate.save(output_file)
+    except BaseException:
+        _remove_file(output_file)
+        raise
+    return output_file
+
+def _play_file(output_file: str) -> None:
+    """
+    Plays a generated audio file, blocking until playback finishes.
 
-        if os.path.exists(output_file):
-            print(f"TTS: Playing audio from {os.path.basename(output_file)}...")
+    Args:
+        output_file (str): Path to the audio file to play.
+    """
+    if os.path.exists(output_file):
+        print(f"TTS: Playing audio from {os.path.basename(output_file)}...")
+        if miniaudio is not None:
+            _play_with_miniaudio(output_file)
+        else:
             # The `playsound` library is simple but can be blocking.
             # It's suitable for this application where we wait for speech to finish.
             playsound(output_file)
-            print("TTS: Audio playback finished.")
-        else:
-            print("TTS: Error - Could not find the generated audio file.")
+        print("TTS: Audio playback finished.")
+    else:
+        print("TTS: Error - Could not find the generated audio file.")
+
+def _play_with_miniaudio(output_file: str) -> None:
+    """
+    Plays an audio file on the shared miniaudio device, blocking until it ends.
+
+    The device is opened once and reused, so each utterance only pays for
+    decoding, not for starting a player or reopening the audio hardware.
+    The wait is bounded by the clip's duration, so a device that never
+    reports the end of the stream cannot hold the playback lock forever.
+
+    Args:
+        output_file (str): Path to the audio file to play.
+    """
+    global _playback_device
+    with _playback_lock:
+        if _playback_device is None:
+            _playback_device = miniaudio.PlaybackDevice()
+        device = _playback_device
+        finished = threading.Event()
+        stream = miniaudio.stream_file(
+            output_file,
+            output_format=device.format,
+            nchannels=device.nchannels,
+            sample_rate=device.sample_rate,
+        )
+        playback = miniaudio.stream_with_callbacks(stream, end_callback=finished.set)
+        # The device sends frame counts into the generator, so it must
+        # already be started.
+        next(playback)
+        timeout = miniaudio.get_file_info(output_file).duration + _PLAYBACK_GRACE_SECONDS
+        device.start(playback)
+        try:
+            if not finished.wait(timeout):
+                print(f"TTS: Playback did not finish within {timeout:.1f}s; stopping it.")
+        finally:
+            device.stop()
+
+def _remove_file(output_file: str) -> None:
+    """
+    Deletes a temporary audio file, ignoring files that are already gone.
+    """
+    try:
+        os.remove(output_file)
+    except FileNotFoundError:
+        pass
+
+async def _stream_to_ffplay(text: str, voice: str) -> None:
+    """
+    Pipes synthesized audio into ffplay as it arrives from the TTS service.
+
+    Playback starts with the first audio chunk instead of after the whole
+    utterance has been downloaded, and nothing is written to disk.
+
+    Args:
+        text (str): The text to be synthesized into speech.
+        voice (str): The voice to use for the synthesis.
+    """
+    print(f"TTS: Streaming speech for: '{text}'")
+    player = subprocess.Popen([_FFPLAY, *_FFPLAY_ARGS], stdin=subprocess.PIPE)
+    try:
+        communicate = edge_tts.Communicate(text, voice)
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                player.stdin.write(chunk["data"])
+        player.stdin.close()
+        await asyncio.to_thread(player.wait)
+        print("TTS: Audio playback finished.")
+    except BaseException:
+        player.kill()
+        raise
+    finally:
+        if not player.stdin.closed:
+            player.stdin.close()
+
+async def _generate_and_play(text: str, voice: str) -> None:
+    """
+    An asynchronous helper function that generates speech and plays it.
+
+    When ffplay is available the audio is streamed straight into it.
+    Otherwise this function creates a temporary file to store the generated
+    speech, plays it using the `playsound` library, and ensures the temporary
+    file is cleaned up afterward.
+
+    Args:
+        text (str): The text to be synthesized into speech.
+        voice (str): The voice to use for the synthesis.
+    """
+    if _FFPLAY:
+        try:
+            await _stream_to_ffplay(text, voice)
+        except Exception as e:
+            print(f"TTS: An error occurred during speech generation or playback: {e}")
+        return
 
+    output_file: Optional[str] = None
+    try:
+        output_file = await _synthesize(text, voice)
+        _play_file(output_file)
     except Exception as e:
         # Catching a broad exception is acceptable here as `edge-tts` or `playsound`
         # can have various issues (network, audio drivers, etc.).
         print(f"TTS: An error occurred during speech generation or playback: {e}")
     finally:
         # Ensure the temporary file is always deleted.
-        if output_file and os.path.exists(output_file):
-            os.remove(output_file)
-            # print(f"TTS: Temporary audio file '{os.path.basename(output_file)}' removed.")
+        if output_file:
+            _remove_file(output_file)
+
+async def _generate_and_play_stream(sentences: List[str], voice: str) -> None:
+    """
+    Synthesizes all sentences concurrently and plays them back in order.
+
+    Playback of the first sentence starts as soon as it has been synthesized,
+    while the following sentences are still being generated.
+
+    Args:
+        sentences (List[str]): The sentences to speak, in order.
+        voice (str): The voice to use for the synthesis.
+    """
+    tasks = [asyncio.create_task(_synthesize(sentence, voice)) for sentence in sentences]
+    try:
+        for task in tasks:
+            output_file = await task
+            try:
+                # Play on a worker thread so the remaining syntheses keep progressing.
+                await asyncio.to_thread(_play_file, output_file)
+            finally:
+                _remove_file(output_file)
+    except Exception as e:
+        print(f"TTS: An error occurred during speech generation or playback: {e}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Clean up any sentences that were synthesized but never played.
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, str):
+                _remove_file(result)
+
+def _split_sentences(text: str) -> List[str]:
+    """
+    Splits text into chunks that can be synthesized independently.
+
+    A chunk ends at sentence-final punctuation, or at a comma once the chunk
+    holds at least `_MIN_CLAUSE_WORDS` words (each CJK character counts as a
+    word), so long sentences still start playing early.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        List[str]: The non-empty chunks, in order.
+    """
+    chunks: List[str] = []
+    current = ""
+    for piece in _CLAUSE_RE.findall(text):
+        current += piece
+        last_char = piece.rstrip()[-1:]
+        if not last_char:
+            continue
+        ends_sentence = last_char in _SENTENCE_ENDINGS
+        ends_clause = last_char in _CLAUSE_ENDINGS
+        if ends_sentence or (ends_clause and _count_words(current) >= _MIN_CLAUSE_WORDS):
+            chunks.append(current.strip())
+            current = ""
+    if current.strip():
+        chunks.append(current.strip())
+    return [chunk for chunk in chunks if chunk]
+
+def _count_words(text: str) -> int:
+    """
+    Counts words, treating each CJK character as one word.
+    """
+    cjk_chars = len(_CJK_RE.findall(text))
+    return cjk_chars + len(_CJK_RE.sub(" ", text).split())
+
+def speak_stream(text: str, voice: str = DEFAULT_VOICE) -> None:
+    """
+    Speaks long text sentence by sentence to reduce time-to-first-audio.
+
+    The text is split at sentence boundaries; the first sentence starts playing
+    as soon as it is synthesized while the rest are generated in the
+    background. Short text with a single sentence behaves exactly like `speak`.
+
+    Args:
+        text (str): The text to be spoken.
+        voice (str): The voice to use. Defaults to `DEFAULT_VOICE`.
+    """
+    sentences = _split_sentences(text) if text else []
+    if len(sentences) <= 1:
+        speak(text, voice)
+        return
+
+    try:
+        _run(_generate_and_play_stream(sentences, voice))
+    except Exception as e:
+        print(f"TTS: An error occurred in the asyncio event loop: {e}")
+
+async def aspeak_many(texts: List[str], voice: str = DEFAULT_VOICE) -> None:
+    """
+    Speaks several utterances, synthesizing them all concurrently.
+
+    Playback is still sequential and in order, so utterances never overlap;
+    only the network-bound synthesis requests run in parallel.
+
+    Args:
+        texts (List[str]): The utterances to speak. Empty strings are skipped.
+        voice (str): The voice to use. Defaults to `DEFAULT_VOICE`.
+    """
+    texts = [text for text in texts if text]
+    if texts:
+        await _generate_and_play_stream(texts, voice)
+
+def speak_many(texts: List[str], voice: str = DEFAULT_VOICE) -> None:
+    """
+    Synchronous wrapper around `aspeak_many` for non-async callers.
+
+    Args:
+        texts (List[str]): The utterances to speak.
+        voice (str): The voice to use. Defaults to `DEFAULT_VOICE`.
+    """
+    try:
+        _run(aspeak_many(texts, voice))
+    except Exception as e:
+        print(f"TTS: An error occurred in the asyncio event loop: {e}")
 
 def speak(text: str, voice: str = DEFAULT_VOICE) -> None:
     """
     Converts text to speech and plays it aloud using Microsoft Edge's TTS service.
 
     This function provides a simple, synchronous interface for the asynchronous
-    TTS generation and playback process. It handles the creation and management
-    of the asyncio event loop.
+    TTS generation and playback process, which runs on a shared, long-lived
+    asyncio event loop.
 
     Args:
         text (str): The text to be spoken.
@@ -68,8 +357,7 @@ def speak(text: str, voice: str = DEFAULT_VOICE) -> None:
         return
         
     try:
-        # `asyncio.run` is the modern way to run a top-level async function.
-        asyncio.run(_generate_and_play(text, voice))
+        _run(_generate_and_play(text, voice))
     except Exception as e:
         print(f"TTS: An error occurred in the asyncio event loop: {e}")
 
@@ -2,8 +2,7 @@
 import tkinter as tk
 from PIL import Image, ImageTk
 import threading
-import time
-from typing import Optional
+from typing import Optional, Tuple
 
 class GUIManager:
     """
@@ -26,12 +25,17 @@ class GUIManager:
         self.root: Optional[tk.Tk] = None
         self.live_panel: Optional[tk.Label] = None
         self.captured_panel: Optional[tk.Label] = None
-        self._live_image_tk: Optional[ImageTk.PhotoImage] = None
-        self._captured_image_tk: Optional[ImageTk.PhotoImage] = None
         self._last_live_image: Optional[Image.Image] = None
         self._last_captured_image: Optional[Image.Image] = None
         self.lock = threading.Lock()
         self.is_running = False
+        # Set once the tkinter mainloop is processing events.
+        self.ready = threading.Event()
+        # True while a `<<NewFrame>>` event is queued but not yet handled, so
+        # frames arriving in between are coalesced into one redraw.
+        self._flush_pending = False
+        # Set once the GUI has been closed, for `wait_for_close`.
+        self._closed = threading.Event()
 
         self.window_width = width
         self.panel_width = (width // 2) - 30
@@ -56,12 +60,42 @@ class GUIManager:
         self.live_panel = self._create_image_panel(main_frame, "Live Camera Feed")
         self.captured_panel = self._create_image_panel(main_frame, "Frame for VLM")
         
+        # Panels are redrawn only when `update_image` delivers a new frame.
+        self.root.bind("<<NewFrame>>", self._flush_frames)
         self.is_running = True
-        self._update_loop()
+        # Runs as the first idle callback, i.e. once mainloop has started.
+        self.root.after_idle(self.ready.set)
         self.root.mainloop()
         
         # Once mainloop exits, ensure the running flag is false
         self.is_running = False
+        self._closed.set()
+
+    def wait_until_ready(self, timeout: float = 5.0) -> None:
+        """
+        Blocks until the GUI's mainloop is running.
+
+        Args:
+            timeout (float): Maximum number of seconds to wait.
+
+        Raises:
+            RuntimeError: If the GUI did not become ready within `timeout`.
+        """
+        if not self.ready.wait(timeout=timeout):
+            raise RuntimeError(f"GUI did not start within {timeout} seconds.")
+
+    def preferred_size(self) -> Tuple[int, int]:
+        """
+        Returns the size at which frames are displayed.
+
+        Frames passed to `update_image` at exactly this size are shown without
+        being resized on the GUI thread, so producers that already scale their
+        frames (e.g., a camera configured for preview) should use it.
+
+        Returns:
+            Tuple[int, int]: The panel (width, height) in pixels.
+        """
+        return self.panel_width, self.panel_height
 
     def _create_image_panel(self, parent: tk.Frame, title: str) -> tk.Label:
         """
@@ -82,24 +116,26 @@ class GUIManager:
         panel.pack(padx=5, pady=5)
         return panel
 
-    def _update_loop(self) -> None:
+    def _flush_frames(self, event: Optional[tk.Event] = None) -> None:
         """
-        Periodically updates the images in the GUI panels.
-        This is the core refresh loop for the GUI.
+        Displays the frames delivered since the last flush.
+        This method should only be called by the GUI thread, in response to
+        the `<<NewFrame>>` event posted by `update_image`.
         """
         if not self.is_running or not self.root:
             return
 
+        # Take the pending frames (consuming them) under the lock, but resize
+        # outside it so producers are never blocked by rendering.
         with self.lock:
-            if self._last_live_image and self.live_panel:
-                self._update_panel_image(self.live_panel, self._last_live_image)
-                self._last_live_image = None  # Consume the frame
+            live_image, self._last_live_image = self._last_live_image, None
+            captured_image, self._last_captured_image = self._last_captured_image, None
+            self._flush_pending = False
 
-            if self._last_captured_image and self.captured_panel:
-                self._update_panel_image(self.captured_panel, self._last_captured_image)
-                self._last_captured_image = None  # Consume the frame
-        
-        self.root.after(30, self._update_loop)  # Aim for ~33 FPS refresh rate
+        if live_image and self.live_panel:
+            self._update_panel_image(self.live_panel, live_image)
+        if captured_image and self.captured_panel:
+            self._update_panel_image(self.captured_panel, captured_image)
 
     def _update_panel_image(self, panel: tk.Label, pil_image: Image.Image) -> None:
         """
@@ -109,7 +145,21 @@ class GUIManager:
             panel (tk.Label): The panel to update.
             pil_image (Image.Image): The PIL image to display.
         """
-        resized_image = pil_image.resize((self.panel_width, self.panel_height), Image.Resampling.LANCZOS)
+        size = self.preferred_size()
+        if pil_image.size == size:
+            resized_image = pil_image
+        elif pil_image.width >= size[0] and pil_image.height >= size[1]:
+            # Area averaging (BOX) is the right downsampling filter and is much
+            # cheaper than LANCZOS, which matters at camera frame rates on the Tk thread.
+            resized_image = pil_image.resize(size, Image.Resampling.BOX)
+        else:
+            resized_image = pil_image.resize(size, Image.Resampling.BILINEAR)
+        img_tk: Optional[ImageTk.PhotoImage] = getattr(panel, "image", None)
+        if img_tk is not None and (img_tk.width(), img_tk.height()) == resized_image.size:
+            # Copy the pixels into the panel's existing Tk photo instead of
+            # creating a new one (and a new Tk image) for every frame.
+            img_tk.paste(resized_image)
+            return
         img_tk = ImageTk.PhotoImage(image=resized_image)
         panel.configure(image=img_tk)
         # IMPORTANT: Keep a reference to the image to prevent it from being
@@ -121,6 +171,9 @@ class GUIManager:
         Thread-safe method to update an image for display.
 
         The main application thread calls this method to provide new frames.
+        The GUI runs in the same process, so the frame is shared by reference
+        rather than copied: the same image object can be handed to both the
+        GUI and the VLM. Callers must not modify an image after passing it in.
 
         Args:
             pil_image (Image.Image): The new image to display.
@@ -131,9 +184,20 @@ class GUIManager:
         
         with self.lock:
             if panel_type == "live":
-                self._last_live_image = pil_image.copy()
+                self._last_live_image = pil_image
             elif panel_type == "captured":
-                self._last_captured_image = pil_image.copy()
+                self._last_captured_image = pil_image
+            else:
+                return
+            if self._flush_pending or not self.root:
+                return
+            self._flush_pending = True
+
+        try:
+            self.root.event_generate("<<NewFrame>>", when="tail")
+        except (tk.TclError, RuntimeError):
+            # The window was closed while the frame was being delivered.
+            self._flush_pending = False
 
     def close(self) -> None:
         """
@@ -145,14 +209,18 @@ class GUIManager:
             # The mainloop might be blocking. Destroy forces it to exit.
             if self.root:
                 self.root.destroy()
+            self._closed.set()
 
     def wait_for_close(self) -> None:
         """
         Allows the main thread to block until the GUI is closed.
         """
-        while self.is_running:
+        while True:
             try:
-                time.sleep(0.1)
+                # Wake up once a second so Ctrl+C is noticed on every platform
+                # (a plain wait() can't be interrupted on Windows).
+                if self._closed.wait(timeout=1.0) or not self.gui_thread.is_alive():
+                    break
             except KeyboardInterrupt:
                 self.close()
                 break
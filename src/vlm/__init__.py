@@ -17,10 +17,13 @@ To add a new VLM service:
    an instance of your new class.
 """
 
+import importlib
+from functools import lru_cache
 from typing import Any
 from .vlm_interface import VLMInterface
-from .gemini_vlm import GeminiAPI_VLM
-from .local_qwen_vlm import LocalQwenVL
+from .image_utils import DEFAULT_MAX_SIDE, encode_jpeg, prepare_image
+from .batcher import BatchedVLM, VLMBatcher
+from .routing_vlm import RoutingVLM
 
 def get_vlm_service(service_name: str = "gemini", **kwargs: Any) -> VLMInterface:
     """
@@ -31,6 +34,11 @@ def get_vlm_service(service_name: str = "gemini", **kwargs: Any) -> VLMInterface
     This allows for flexible configuration, such as passing a specific model
     name or path to the service's constructor.
 
+    Instances are cached per (service_name, kwargs), so repeated calls with
+    the same arguments return the same object and clients and models are built
+    only once per process. Calls with unhashable keyword arguments are not
+    cached; use `reset_cache` to drop cached instances.
+
     Args:
         service_name (str): The identifier for the desired VLM service.
                             Supported values: "gemini", "qwen_vl".
@@ -45,18 +53,48 @@ def get_vlm_service(service_name: str = "gemini", **kwargs: Any) -> VLMInterface
     Raises:
         ValueError: If the specified `service_name` is not supported.
     """
+    try:
+        kwargs_key = tuple(sorted(kwargs.items()))
+        hash(kwargs_key)
+    except TypeError:
+        # Unhashable arguments (e.g., a list) cannot form a cache key.
+        return _create_vlm_service(service_name, **kwargs)
+    return _get_cached_vlm_service(service_name, kwargs_key)
+
+@lru_cache(maxsize=None)
+def _get_cached_vlm_service(service_name: str, kwargs_key: tuple) -> VLMInterface:
+    """
+    Creates the VLM service for a hashable (service_name, sorted kwargs) key, once.
+    """
+    return _create_vlm_service(service_name, **dict(kwargs_key))
+
+def _create_vlm_service(service_name: str, **kwargs: Any) -> VLMInterface:
+    """
+    Instantiates the requested VLM service without caching.
+    """
     if service_name == "gemini":
         # For Gemini, kwargs can be used to specify a different model,
         # e.g., get_vlm_service("gemini", model_name="gemini-1.5-flash")
+        # Imported on demand; the Gemini SDK is slow to import.
+        GeminiAPI_VLM = importlib.import_module(".gemini_vlm", __package__).GeminiAPI_VLM
         return GeminiAPI_VLM(**kwargs)
     elif service_name == "qwen_vl":
         # For a local model, kwargs would be essential for providing the model path.
         # e.g., get_vlm_service("qwen_vl", model_path="/path/to/model")
         # Provide a default path for the mock if not specified.
         kwargs.setdefault("model_path", "mock/path/to/Qwen-VL-Chat")
+        LocalQwenVL = importlib.import_module(".local_qwen_vlm", __package__).LocalQwenVL
         return LocalQwenVL(**kwargs)
     else:
         raise ValueError(f"Unsupported VLM service: '{service_name}'")
 
+def reset_cache() -> None:
+    """
+    Drops all cached VLM service instances, so the next `get_vlm_service`
+    call creates a new one. Callers remain responsible for releasing the old
+    instances.
+    """
+    _get_cached_vlm_service.cache_clear()
+
 # Expose the core components for easy import from other modules.
-__all__ = ["VLMInterface", "get_vlm_service"]
+__all__ = ["VLMInterface", "get_vlm_service", "encode_jpeg", "prepare_image", "DEFAULT_MAX_SIDE", "VLMBatcher", "BatchedVLM", "RoutingVLM", "reset_cache"]
@@ -0,0 +1,215 @@
+# src/vlm/batcher.py
+import asyncio
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from PIL import Image
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .vlm_interface import VLMInterface
+
+class VLMBatcher:
+    """
+    Micro-batches concurrent VLM requests into `get_decision_batch` calls.
+
+    Callers submit a prompt and image and immediately receive a Future. A
+    single background thread waits for the first pending request, then keeps
+    collecting until either `max_batch_size` requests are queued or
+    `max_wait` seconds have passed, and sends them to the VLM service as one
+    batch. Each response is delivered to the Future of the request it
+    belongs to, in submission order.
+    """
+
+    def __init__(
+        self,
+        vlm_service: VLMInterface,
+        max_batch_size: int = 8,
+        max_wait: float = 0.05,
+        response_schema: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Initializes the batcher and starts its worker thread.
+
+        Args:
+            vlm_service (VLMInterface): The VLM service that receives the batches.
+            max_batch_size (int): Maximum number of requests per batch.
+            max_wait (float): Longest time, in seconds, the first request of a
+                              batch waits for more requests to arrive.
+            response_schema (Optional[Dict[str, Any]]): Passed through to
+                              `VLMInterface.get_decision_batch`.
+        """
+        self.vlm_service = vlm_service
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.response_schema = response_schema
+
+        self._requests: "queue.Queue[Optional[Tuple[str, Union[Image.Image, bytes], Future]]]" = queue.Queue()
+        self._closed = False
+        # Makes the closed check and the enqueue atomic, so no request can
+        # be queued behind the stop sentinel, where it would never be sent.
+        self._close_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="vlm-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, text: str, image: Union[Image.Image, bytes]) -> "Future[str]":
+        """
+        Queues a request for the next batch.
+
+        Args:
+            text (str): The prompt for the VLM.
+            image (Union[Image.Image, bytes]): The visual context.
+
+        Returns:
+            Future[str]: Resolves to the VLM's raw response, or to the exception
+                         raised by the batch call.
+
+        Raises:
+            RuntimeError: If the batcher has been closed.
+        """
+        future: "Future[str]" = Future()
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("VLMBatcher is closed.")
+            self._requests.put((text, image, future))
+        return future
+
+    def close(self) -> None:
+        """
+        Stops accepting requests. Requests already queued are still processed.
+        """
+        with self._close_lock:
+            if not self._closed:
+                self._closed = True
+                self._requests.put(None)
+
+    def _run(self) -> None:
+        """
+        Collects and sends batches until closed.
+        This method should only be called by the worker thread.
+        """
+        while True:
+            first = self._requests.get()
+            if first is None:
+                return
+            batch = [first]
+            stop_after_batch = False
+
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop_after_batch = True
+                    break
+                batch.append(request)
+
+            self._send(batch)
+            if stop_after_batch:
+                return
+
+    def _send(self, batch: List[Tuple[str, Union[Image.Image, bytes], Future]]) -> None:
+        """
+        Sends one batch to the VLM and resolves its futures.
+        """
+        # Skip requests whose caller has already cancelled them.
+        batch = [request for request in batch if request[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        texts = [text for text, _, _ in batch]
+        images = [image for _, image, _ in batch]
+        print(f"VLMBatcher: Sending batch of {len(batch)} request(s).")
+        try:
+            responses = self.vlm_service.get_decision_batch(texts, images, response_schema=self.response_schema)
+            if len(responses) != len(batch):
+                raise RuntimeError(f"Expected {len(batch)} responses from the VLM, got {len(responses)}.")
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, _, future), response in zip(batch, responses):
+            future.set_result(response)
+
+class BatchedVLM(VLMInterface):
+    """
+    A VLM service that transparently micro-batches concurrent requests.
+
+    Wraps another `VLMInterface` implementation. Each call to `get_decision`
+    (from any thread) or `aget_decision` (from any event loop) is queued on a
+    `VLMBatcher`, so requests from parallel callers that arrive within
+    `max_wait` seconds share one `get_decision_batch` call on the wrapped
+    service, i.e. one forward pass on a local model. Requests with different
+    response schemas are batched separately.
+    """
+
+    def __init__(self, inner: VLMInterface, max_batch_size: int = 8, max_wait: float = 0.02) -> None:
+        """
+        Initializes the wrapper. Batchers are started on first use.
+
+        Args:
+            inner (VLMInterface): The service that receives the batches.
+            max_batch_size (int): Maximum number of requests per batch.
+            max_wait (float): Longest time, in seconds, the first request of a
+                              batch waits for more requests to arrive.
+        """
+        self.inner = inner
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._batchers: Dict[Optional[str], VLMBatcher] = {}
+        self._lock = threading.Lock()
+
+    def _batcher_for(self, response_schema: Optional[Dict[str, Any]]) -> VLMBatcher:
+        """
+        Returns the batcher for a response schema, creating it on first use.
+        """
+        key = None if response_schema is None else json.dumps(response_schema, sort_keys=True)
+        with self._lock:
+            batcher = self._batchers.get(key)
+            if batcher is None:
+                batcher = VLMBatcher(self.inner, self.max_batch_size, self.max_wait, response_schema)
+                self._batchers[key] = batcher
+            return batcher
+
+    def get_decision(self, text: str, image: Union[Image.Image, bytes], response_schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Queues the request for the next batch and blocks until it is answered.
+        See `VLMInterface.get_decision`.
+        """
+        return self._batcher_for(response_schema).submit(text, image).result()
+
+    async def aget_decision(self, text: str, image: Union[Image.Image, bytes], response_schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Queues the request for the next batch and awaits the answer without
+        blocking the event loop. See `VLMInterface.aget_decision`.
+        """
+        return await asyncio.wrap_future(self._batcher_for(response_schema).submit(text, image))
+
+    def get_decision_batch(self, texts: List[str], images: List[Union[Image.Image, bytes]], response_schema: Optional[Dict[str, Any]] = None) -> List[str]:
+        """
+        Sends an already-formed batch straight to the wrapped service.
+        """
+        return self.inner.get_decision_batch(texts, images, response_schema=response_schema)
+
+    def warm_up(self) -> None:
+        """
+        Warms up the wrapped service.
+        """
+        self.inner.warm_up()
+
+    def close(self) -> None:
+        """
+        Stops all batchers. Requests already queued are still processed.
+        """
+        with self._lock:
+            batchers = list(self._batchers.values())
+            self._batchers.clear()
+        for batcher in batchers:
+            batcher.close()
@@ -1,9 +1,37 @@
 # src/vlm/gemini_vlm.py
 from .vlm_interface import VLMInterface
+from .image_utils import prepare_image
 import google.generativeai as genai
 import os
 from PIL import Image
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Union
+
+@lru_cache(maxsize=None)
+def _load_env() -> None:
+    """
+    Loads the `.env` file into the environment, only on the first call.
+    """
+    load_dotenv()
+
+@lru_cache(maxsize=None)
+def _configure(api_key: str) -> None:
+    """
+    Configures the `google.generativeai` client, once per API key.
+    """
+    genai.configure(api_key=api_key)
+
+@lru_cache(maxsize=None)
+def _get_model(model_name: str) -> "genai.GenerativeModel":
+    """
+    Returns the shared model object for `model_name`.
+
+    All instances using the same model share one client, and with it one
+    gRPC channel, so only the first request pays for the TLS handshake.
+    """
+    return genai.GenerativeModel(model_name)
 
 class GeminiAPI_VLM(VLMInterface):
     """
@@ -20,11 +48,11 @@ class GeminiAPI_VLM(VLMInterface):
         Initializes and configures the Gemini VLM service client.
 
         This constructor performs the following critical steps:
-        1. Loads environment variables from a `.env` file.
+        1. Loads environment variables from a `.env` file (once per process).
         2. Retrieves the `GEMINI_API_KEY`.
         3. Validates the key's presence.
-        4. Configures the `google.generativeai` client.
-        5. Instantiates the specified generative model.
+        4. Configures the `google.generativeai` client (once per API key).
+        5. Gets the specified generative model, shared between instances.
 
         Args:
             model_name (str): The identifier for the Gemini model to be used.
@@ -35,7 +63,7 @@ class GeminiAPI_VLM(VLMInterface):
             ValueError: If the `GEMINI_API_KEY` is missing, empty, or still
                         set to its placeholder value in the `.env` file.
         """
-        load_dotenv()
+        _load_env()
         api_key = os.getenv("GEMINI_API_KEY")
 
         if not api_key or api_key == "YOUR_API_KEY_HERE":
@@ -45,14 +73,25 @@ class GeminiAPI_VLM(VLMInterface):
             )
 
         try:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel(model_name)
+            _configure(api_key)
+            self.model = _get_model(model_name)
             print(f"GeminiVLM: Service initialized with model '{model_name}'.")
         except Exception as e:
             print(f"GeminiVLM: Failed to initialize Google GenAI. Error: {e}")
             raise
 
-    def get_decision(self, text: str, image: Image.Image) -> str:
+    def warm_up(self) -> None:
+        """
+        Sends a tiny one-token request to establish the API connection early.
+        """
+        print("GeminiVLM: Warming up API connection...")
+        self.model.generate_content(
+            ["warmup", Image.new("RGB", (64, 64))],
+            generation_config=genai.GenerationConfig(max_output_tokens=1),
+        )
+        print("GeminiVLM: Warm-up complete.")
+
+    def get_decision(self, text: str, image: Union[Image.Image, bytes], response_schema: Optional[Dict[str, Any]] = None) -> str:
         """
         Sends a multimodal prompt to the Gemini API and returns the raw response.
 
@@ -62,7 +101,12 @@ class GeminiAPI_VLM(VLMInterface):
 
         Args:
             text (str): The textual part of the prompt (e.g., user command).
-            image (Image.Image): A PIL Image object providing the visual context.
+            image (Union[Image.Image, bytes]): The visual context, as a PIL Image
+                or as JPEG bytes. Bytes are uploaded as-is, without re-encoding;
+                images are first downsampled with `prepare_image`.
+            response_schema (Optional[Dict[str, Any]]): If given, Gemini's JSON
+                mode is enabled and the response is constrained to this schema,
+                so it is returned as raw JSON without markdown fences.
 
         Returns:
             str: The raw text response from the Gemini API.
@@ -75,20 +119,108 @@ class GeminiAPI_VLM(VLMInterface):
         print("GeminiVLM: Sending request to API...")
         try:
             # The generate_content method accepts a list of mixed-modality parts.
-            response = self.model.generate_content([text, image])
+            response = self.model.generate_content(
+                self._build_parts(text, image),
+                generation_config=self._build_generation_config(response_schema),
+            )
             print("GeminiVLM: Received response from API.")
-            
-            # Clean the response text
-            cleaned_response = response.text.strip()
-            if cleaned_response.startswith('```') and cleaned_response.endswith('```'):
-                # Find the first newline and the last newline to extract content
-                first_newline = cleaned_response.find('\n')
-                last_newline = cleaned_response.rfind('\n')
-                if first_newline != -1 and last_newline != -1 and last_newline > first_newline:
-                    cleaned_response = cleaned_response[first_newline + 1:last_newline].strip()
-            
-            return cleaned_response
+            return self._clean_response(response.text)
         except Exception as e:
             print(f"GeminiVLM: An error occurred during the API call: {e}")
             # Re-raising is important for the caller to handle API failures.
             raise
+
+    async def aget_decision(self, text: str, image: Union[Image.Image, bytes], response_schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Asynchronous version of `get_decision` using the SDK's native async client.
+
+        No thread is tied up while the request is in flight, so many requests
+        can be awaited concurrently (e.g., with `asyncio.gather`).
+
+        Args:
+            text (str): The textual part of the prompt.
+            image (Union[Image.Image, bytes]): The visual context, as in `get_decision`.
+            response_schema (Optional[Dict[str, Any]]): As in `get_decision`.
+
+        Returns:
+            str: The raw text response from the Gemini API.
+
+        Raises:
+            Exception: Propagates any exceptions that occur during the API call.
+        """
+        print("GeminiVLM: Sending async request to API...")
+        try:
+            response = await self.model.generate_content_async(
+                self._build_parts(text, image),
+                generation_config=self._build_generation_config(response_schema),
+            )
+            print("GeminiVLM: Received response from API.")
+            return self._clean_response(response.text)
+        except Exception as e:
+            print(f"GeminiVLM: An error occurred during the API call: {e}")
+            raise
+
+    @staticmethod
+    def _build_parts(text: str, image: Union[Image.Image, bytes]) -> List[Any]:
+        """
+        Builds the content parts of a request from the prompt and image.
+        """
+        # Already-encoded JPEG bytes are passed as an inline blob part; a PIL
+        # Image is re-encoded by the SDK, so it is downsampled first to keep
+        # the upload and the image token count small.
+        image_part = {"mime_type": "image/jpeg", "data": image} if isinstance(image, bytes) else prepare_image(image)
+        return [text, image_part]
+
+    @staticmethod
+    def _build_generation_config(response_schema: Optional[Dict[str, Any]]) -> Optional["genai.GenerationConfig"]:
+        """
+        Returns a JSON-mode generation config for `response_schema`, or None.
+        """
+        if response_schema is None:
+            return None
+        return genai.GenerationConfig(
+            response_mime_type="application/json",
+            response_schema=response_schema,
+        )
+
+    @staticmethod
+    def _clean_response(response_text: str) -> str:
+        """
+        Strips whitespace and a surrounding markdown code fence from a response.
+        """
+        cleaned_response = response_text.strip()
+        if cleaned_response.startswith('```') and cleaned_response.endswith('```'):
+            # Find the first newline and the last newline to extract content
+            first_newline = cleaned_response.find('\n')
+            last_newline = cleaned_response.rfind('\n')
+            if first_newline != -1 and last_newline != -1 and last_newline > first_newline:
+                cleaned_response = cleaned_response[first_newline + 1:last_newline].strip()
+        return cleaned_response
+
+    def get_decision_batch(self, texts: List[str], images: List[Union[Image.Image, bytes]], response_schema: Optional[Dict[str, Any]] = None) -> List[str]:
+        """
+        Sends several requests to the Gemini API concurrently.
+
+        `generate_content` has no multi-prompt form, so each request is still a
+        separate API call; issuing them in parallel means the batch takes
+        roughly as long as its slowest request instead of the sum of all.
+
+        Args:
+            texts (List[str]): The prompts, one per request.
+            images (List[Union[Image.Image, bytes]]): The images, aligned with `texts`.
+            response_schema (Optional[Dict[str, Any]]): Applied to every request.
+
+        Returns:
+            List[str]: The cleaned responses, in request order.
+
+        Raises:
+            Exception: The first error raised by any of the API calls.
+        """
+        if len(texts) <= 1:
+            return super().get_decision_batch(texts, images, response_schema=response_schema)
+        with ThreadPoolExecutor(max_workers=len(texts), thread_name_prefix="gemini-batch") as executor:
+            futures = [
+                executor.submit(self.get_decision, text, image, response_schema)
+                for text, image in zip(texts, images)
+            ]
+            return [future.result() for future in futures]
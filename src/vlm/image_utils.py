@@ -0,0 +1,92 @@
+# src/vlm/image_utils.py
+import io
+import numpy as np
+from functools import lru_cache
+from PIL import Image
+from typing import Any, Optional, Union
+
+try:
+    from turbojpeg import TJPF_RGB, TurboJPEG
+except ImportError:
+    TurboJPEG = None
+
+@lru_cache(maxsize=None)
+def _get_turbojpeg() -> Optional[Any]:
+    """
+    Returns a shared TurboJPEG encoder, or None if PyTurboJPEG or the
+    libjpeg-turbo library is not available.
+    """
+    if TurboJPEG is None:
+        return None
+    try:
+        return TurboJPEG()
+    except (OSError, RuntimeError) as e:
+        print(f"image_utils: TurboJPEG unavailable, using PIL for JPEG encoding ({e}).")
+        return None
+
+# Longest side (in pixels) of images sent to a VLM. Gemini 2.5 Flash tiles
+# anything larger, so bigger frames only add upload bytes and image tokens.
+# main.py's `AppConfig.VLM_MAX_IMAGE_SIDE` defaults to this value.
+DEFAULT_MAX_SIDE = 768
+
+def prepare_image(image: Image.Image, max_side: int = DEFAULT_MAX_SIDE) -> Image.Image:
+    """
+    Returns an RGB image whose longer side is at most `max_side` pixels.
+
+    The image is resized in uint8 with BILINEAR filtering, which is much
+    faster than LANCZOS and makes no difference to a VLM's vision encoder.
+    The input is returned as-is if it already fits and is RGB; otherwise a
+    new image is returned and the input is left untouched.
+
+    Preparing is idempotent: a prepared image is returned unchanged. Callers
+    that pass one frame to several VLM calls should prepare it once and
+    pass the prepared image on, so the conversion is not repeated.
+
+    Args:
+        image (Image.Image): The image to prepare.
+        max_side (int): The maximum width or height in pixels.
+
+    Returns:
+        Image.Image: The prepared image.
+    """
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    width, height = image.size
+    scale = max_side / max(width, height)
+    if scale < 1:
+        image = image.resize((max(1, round(width * scale)), max(1, round(height * scale))), Image.Resampling.BILINEAR)
+    return image
+
+def encode_jpeg(image: Union[Image.Image, np.ndarray], quality: int = 85) -> bytes:
+    """
+    Encodes an image as JPEG bytes for sending to a VLM service.
+
+    A compressed payload is a fraction of the size of the decoded pixels, so
+    callers can drop the image itself before a long network round trip.
+
+    When PyTurboJPEG and libjpeg-turbo are installed, RGB images are encoded
+    with its SIMD encoder, which is several times faster than PIL's. PIL is
+    used otherwise.
+
+    Args:
+        image (Union[Image.Image, np.ndarray]): The image to encode, as a PIL
+            Image or an (height, width, 3) uint8 RGB array such as a camera
+            frame. Non-RGB images are converted.
+        quality (int): JPEG quality from 1 to 95. Defaults to 85.
+
+    Returns:
+        bytes: The JPEG-encoded image.
+    """
+    turbojpeg = _get_turbojpeg()
+    if turbojpeg is not None:
+        pixels = np.asarray(image) if isinstance(image, Image.Image) and image.mode == "RGB" else image
+        if isinstance(pixels, np.ndarray) and pixels.ndim == 3 and pixels.shape[2] == 3 and pixels.dtype == np.uint8:
+            return turbojpeg.encode(np.ascontiguousarray(pixels), quality=quality, pixel_format=TJPF_RGB)
+
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
@@ -1,74 +1,910 @@
 # src/vlm/local_qwen_vlm.py
 from .vlm_interface import VLMInterface
+from .image_utils import prepare_image
+from .mm_cache import VisionEmbedCache, image_hash
 from PIL import Image
+import asyncio
+import importlib
+import importlib.util
+import io
+import json
+import logging
+import numpy as np
 import time
 import os
+import threading
 
-from typing import Any
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Per-request messages go to this logger at DEBUG level, so they cost nothing
+# unless enabled; one-off lifecycle messages are printed like elsewhere.
+logger = logging.getLogger(__name__)
+
+# h5py is only needed for the persistent embedding store.
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+# torch and transformers are only needed to run a real model; without them
+# the class falls back to the mock.
+try:
+    import torch
+    from transformers import AutoModelForVision2Seq, AutoProcessor, DynamicCache, TorchAoConfig
+except ImportError:
+    torch = None
+
+# lm-format-enforcer constrains generation to a response schema; without it
+# the real model generates unconstrained text.
+try:
+    from lmformatenforcer import JsonSchemaParser
+    from lmformatenforcer.integrations.transformers import build_transformers_prefix_allowed_tokens_fn
+except ImportError:
+    JsonSchemaParser = None
+
+# Upper bound on generated tokens per request for the real model.
+_MAX_NEW_TOKENS = 512
+
+# Warm-up prompts of different lengths, so a compiled forward is traced for
+# more than one sequence length before real requests arrive.
+_WARM_UP_PROMPTS = ("warmup", "Describe the objects on the table and where each one is.")
+
+# Tokens generated per warm-up request; enough to run the decode loop.
+_WARM_UP_NEW_TOKENS = 4
+
+# torchao weight-only schemes for the `quantization` option. Weights are
+# stored in 8 bits and dequantized on the fly, halving weight memory and the
+# bytes read per decode step; activations stay in bf16/fp16. FP8 needs an
+# Ada or Hopper GPU.
+_QUANTIZATION_TYPES = {
+    "int8": "int8_weight_only",
+    "fp8": "float8_weight_only",
+}
+
+# Image files picked up by `cache_embeddings`.
+_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+# Simulated inference time of one forward pass, whatever the batch size.
+_MOCK_INFERENCE_SECONDS = 2
+
+# Mock structured response for development and testing.
+_MOCK_RESPONSE = """
+<plan>
+  <step>
+    <action>ASK_CLARIFICATION</action>
+    <target>您是指哪一個物件？</target>
+    <reason>This is a mock response from the local Qwen-VL model.</reason>
+  </step>
+</plan>
+""".strip()
+
+class QwenImageInputs:
+    """
+    An image already run through the real model's image processor.
+
+    Returned by `LocalQwenVL.preprocess_image` and accepted by
+    `get_decision` in place of the image, so a frame reused across requests
+    is resized, normalized and hashed only once.
+    """
+
+    def __init__(self, pixel_values: Any, image_grid_thw: Any, mm_hash: str) -> None:
+        """
+        Args:
+            pixel_values (Any): The processor's flattened image patches.
+            image_grid_thw (Any): The processor's (1, 3) patch grid.
+            mm_hash (str): The content hash of the processed image.
+        """
+        self.pixel_values = pixel_values
+        self.image_grid_thw = image_grid_thw
+        self.mm_hash = mm_hash
 
 class LocalQwenVL(VLMInterface):
     """
-    A mock implementation of the VLMInterface for a local Qwen-VL model.
-
-    This class serves as a placeholder for a self-hosted Qwen-VL model. It
-    simulates the model's behavior by returning a fixed JSON response after a
-    brief delay, allowing the application to be tested end-to-end without
-    the need for a powerful GPU and complex local model setup.
-
-    To create a real implementation, you would need to:
-    1. Install the necessary libraries (e.g., transformers, torch).
-    2. Load the tokenizer and model from a local path in `__init__`.
-    3. Implement the `get_decision` method to perform real inference, including
-       image preprocessing, tokenization, and model generation.
+    An implementation of the VLMInterface for a local Qwen-VL model.
+
+    When `model_path` is a local directory with Qwen2-VL-style weights and
+    torch and transformers are installed, the model is loaded with Hugging
+    Face transformers and run on the GPU in bfloat16 (float16 on GPUs without
+    bfloat16 support). Otherwise the class acts as a mock: it simulates the
+    model's behavior by returning a fixed response after a brief delay,
+    allowing the application to be tested end-to-end without the need for a
+    powerful GPU and complex local model setup.
+
+    Callers that reuse a frame across several requests (retries,
+    clarification turns) can run `preprocess_image` once and pass the
+    result instead of the image, skipping resize, normalization and hashing.
     """
 
-    def __init__(self, model_path: str, **kwargs: Any) -> None:
+    # Fixed input resolution and CLIP normalization of the mock's
+    # preprocessing. IMAGE_SIZE is also the input size of a TensorRT vision
+    # engine; otherwise the real model's processor picks the resolution.
+    IMAGE_SIZE = 448
+    IMAGE_MEAN = np.array([0.48145466, 0.4578275, 0.40821073], dtype=np.float32)
+    IMAGE_STD = np.array([0.26862954, 0.26130258, 0.27577711], dtype=np.float32)
+
+    def __init__(self, model_path: str, embedding_store: Optional[str] = None, use_mock: Optional[bool] = None, compile_model: bool = True, vision_engine_path: Optional[str] = None, prefix_cache_bytes: int = 512 * 1024 * 1024, quantization: Optional[str] = None, defer_load: bool = False, **kwargs: Any) -> None:
         """
-        Initializes the mock LocalQwenVL service.
+        Initializes the LocalQwenVL service, loading the model if available.
 
-        In a real scenario, this would involve loading a large model from the
-        disk, which could be resource-intensive.
+        Loading a real model reads several GB from disk and can take a while.
 
         Args:
-            model_path (str): The path where the local model would be stored.
+            model_path (str): The local directory containing the model.
+            embedding_store (Optional[str]): Path to an HDF5 file written by
+                `cache_embeddings`. Views found in it skip the vision tower
+                of the real model; the mock ignores it.
+            use_mock (Optional[bool]): Force the mock (True) or the real model
+                (False). By default the real model is used when `model_path`
+                exists and torch and transformers are installed.
+            compile_model (bool): Whether to `torch.compile` the model's
+                forward pass on CUDA. Compilation happens during the warm-up
+                at load time and takes tens of seconds.
+            vision_engine_path (Optional[str]): A TensorRT engine built with
+                `qwen_trt.build_vision_engine`. If given, it replaces the
+                model's PyTorch vision tower, and images are resized to
+                IMAGE_SIZE x IMAGE_SIZE to match the engine's fixed shape.
+            prefix_cache_bytes (int): Memory budget for the KV caches of
+                image prompt prefixes (see `_prefix_cache_for`). 0 disables
+                prefix caching.
+            quantization (Optional[str]): "int8" or "fp8" for weight-only
+                quantization at load time (CUDA only). Pre-quantized AWQ or
+                GPTQ checkpoints need no option; their quantization config
+                is read from the model directory.
+            defer_load (bool): Skip loading the real model here; it is then
+                loaded by `aload` (see `create`). Requests fail until it is.
             **kwargs: Catches any additional arguments that might be passed.
+
+        Raises:
+            ImportError: If `use_mock` is False but torch or transformers is missing.
+            ValueError: If `quantization` is not a supported scheme.
         """
+        if quantization is not None and quantization not in _QUANTIZATION_TYPES:
+            raise ValueError(f"Unsupported quantization: '{quantization}'. Supported: {sorted(_QUANTIZATION_TYPES)}")
         self.model_path = model_path
-        print("LocalQwenVL: Service initialized (mock).")
-        print(f"LocalQwenVL: Real implementation would load model from: '{self.model_path}'")
+        # Projected vision-tower outputs of the real model, keyed by image
+        # content, reused across turns and batches that show the same scene.
+        self.vision_cache = VisionEmbedCache()
+        self._embedding_store: Optional[Any] = None
+        if embedding_store is not None:
+            self.load_embedding_store(embedding_store)
+
+        if use_mock is None:
+            use_mock = torch is None or not os.path.isdir(model_path)
+        self.use_mock = use_mock
+        self.model: Optional[Any] = None
+        self.processor: Optional[Any] = None
+        self.compile_model = compile_model
+        self.quantization = quantization
+        # Token filters for constrained decoding, built once per response schema.
+        self._schema_filters: Dict[str, Any] = {}
+        self.vision_engine_path = vision_engine_path
+        # KV caches of the prompt up to and including the image, keyed by
+        # image content, so follow-up questions about the same frame skip
+        # the vision tower and the image prefill.
+        self.prefix_cache = VisionEmbedCache(prefix_cache_bytes) if prefix_cache_bytes > 0 else None
+        # `generate` extends a cached prefix in place and reads the model's
+        # rope offsets, so generations run one at a time.
+        self._generate_lock = threading.Lock()
+        # Set once `warm_up` has run, which `_load_model` already does.
+        self._warmed_up = False
+        if use_mock:
+            print("LocalQwenVL: Service initialized (mock).")
+            print(f"LocalQwenVL: Real implementation would load model from: '{self.model_path}'")
+        elif not defer_load:
+            self._load_model()
+
+    @classmethod
+    async def create(cls, model_path: str, **kwargs: Any) -> "LocalQwenVL":
+        """
+        Creates the service and loads its model without blocking the event loop.
+
+        This is the preferred constructor in async applications: several
+        services can be created concurrently, e.g. with
+        `asyncio.gather(LocalQwenVL.create(...), LocalQwenVL.create(...))`,
+        so startup takes about as long as the slowest load instead of the
+        sum of all loads.
+
+        Args:
+            model_path (str): The local directory containing the model.
+            **kwargs: Passed to the constructor.
+
+        Returns:
+            LocalQwenVL: The loaded (or mock) service.
+        """
+        service = cls(model_path, defer_load=True, **kwargs)
+        await service.aload()
+        return service
+
+    async def aload(self) -> None:
+        """
+        Loads the real model in a worker thread, if it is not loaded yet.
+
+        Weight loading, compilation and warm-up are blocking; running them
+        with `asyncio.to_thread` keeps the event loop (and, e.g., a server's
+        health checks) responsive meanwhile.
+        """
+        if self.use_mock or self.model is not None:
+            return
+        await asyncio.to_thread(self._load_model)
+
+    def _load_model(self) -> None:
+        """
+        Loads the processor and model weights in half precision.
+
+        bfloat16 (or float16 on GPUs without bfloat16) halves the bytes moved
+        per layer and runs the matmuls on tensor cores; the remaining float32
+        matmuls are allowed to use TF32.
+        """
+        if torch is None:
+            raise ImportError("torch and transformers are required to run LocalQwenVL with a real model.")
+
+        print(f"LocalQwenVL: Loading model from '{self.model_path}'...")
+        torch.set_float32_matmul_precision("high")
+        if torch.cuda.is_available():
+            self.device = "cuda"
+            self.dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        else:
+            self.device = "cpu"
+            self.dtype = torch.float32
+
+        self.processor = AutoProcessor.from_pretrained(self.model_path)
+        # Decoder-only generation needs left padding for batched prompts.
+        self.processor.tokenizer.padding_side = "left"
+        quantization_config = None
+        if self.quantization is not None:
+            if self.device == "cuda":
+                quantization_config = TorchAoConfig(_QUANTIZATION_TYPES[self.quantization])
+            else:
+                print(f"LocalQwenVL: {self.quantization} quantization needs CUDA; loading unquantized weights.")
+        self.model = AutoModelForVision2Seq.from_pretrained(
+            self.model_path,
+            torch_dtype=self.dtype,
+            device_map=self.device,
+            quantization_config=quantization_config,
+            attn_implementation=self._attn_implementation(),
+        )
+        self.model.config.use_cache = True
+        self.model.eval()
+        if self.device == "cuda":
+            # Two pinned staging slots, used alternately, let one request's
+            # host-to-device copy run on its own stream while the previous
+            # request's copy may still be in flight.
+            self._copy_stream = torch.cuda.Stream()
+            self._staging: Dict[Tuple[int, str], Any] = {}
+            self._staging_events = [torch.cuda.Event(), torch.cuda.Event()]
+            self._staging_slot = 0
+            self._staging_lock = threading.Lock()
+        if self.vision_engine_path is not None:
+            self._attach_vision_engine()
+        print(f"LocalQwenVL: Model loaded on {self.device} ({self.dtype}, {self.model.config._attn_implementation} attention).")
+        # Pay kernel selection, cuBLAS setup and compilation costs now rather
+        # than on the first request.
+        if self.compile_model and self.device == "cuda":
+            self._compile_model()
+        else:
+            self.warm_up()
+
+    def _attn_implementation(self) -> str:
+        """
+        Returns the fastest attention kernel available for the model.
+
+        FlashAttention-2 needs the flash-attn package and half-precision
+        weights on CUDA. Otherwise PyTorch's fused
+        `scaled_dot_product_attention` is used; either way the attention
+        matrix is never materialized in full, unlike the eager kernel.
+        """
+        if self.device == "cuda" and self.dtype != torch.float32 and importlib.util.find_spec("flash_attn") is not None:
+            return "flash_attention_2"
+        return "sdpa"
+
+    def _compile_model(self) -> None:
+        """
+        Compiles the model's forward pass, reverting to eager mode on any failure.
+        """
+        forward = self.model.forward
+        print("LocalQwenVL: Compiling forward pass with torch.compile...")
+        try:
+            # Compile `forward` rather than the module: `generate` calls the
+            # module's own forward, which would bypass a compiled wrapper.
+            # Prompt and KV-cache lengths vary, so shapes are marked dynamic.
+            self.model.forward = torch.compile(forward, mode="reduce-overhead", dynamic=True)
+            # Compilation is lazy; trace now instead of on the first command.
+            self.warm_up()
+        except Exception as e:
+            print(f"LocalQwenVL: torch.compile failed, using eager mode. Error: {e}")
+            self.model.forward = forward
+
+    def _attach_vision_engine(self) -> None:
+        """
+        Replaces the model's vision module with a TensorRT engine.
+
+        Raises:
+            ImportError: If TensorRT is not installed.
+        """
+        if self.device != "cuda":
+            print("LocalQwenVL: TensorRT vision engine needs CUDA; keeping the PyTorch vision tower.")
+            self.vision_engine_path = None
+            return
+        TRTVisionTower = importlib.import_module(".qwen_trt", __package__).TRTVisionTower
+        self._vision_module().visual = TRTVisionTower(self.vision_engine_path, device=self.device)
+
+    def warm_up(self) -> None:
+        """
+        Runs a few short generations so CUDA kernels are selected and the
+        compiled graph is traced before the first real request.
+
+        Prompts of two lengths are used so a compiled forward is not
+        specialized to a single sequence length. The dummy image is kept out
+        of the vision-feature and prefix caches. Loading the model already
+        warms it up, so later calls (e.g., from the app's start-up) return
+        at once. The mock has no cold-start cost and does nothing.
+        """
+        if self.model is None or self._warmed_up:
+            return
+        print("LocalQwenVL: Warming up model...")
+        image = Image.new("RGB", (self.IMAGE_SIZE, self.IMAGE_SIZE))
+        for prompt in _WARM_UP_PROMPTS:
+            self._generate([prompt], [image], max_new_tokens=_WARM_UP_NEW_TOKENS, use_caches=False)
+        self._warmed_up = True
+        print("LocalQwenVL: Warm-up complete.")
+
+    def _generate(
+        self,
+        texts: List[str],
+        images: List[Union[Image.Image, bytes, np.ndarray, QwenImageInputs]],
+        response_schema: Optional[Dict[str, Any]] = None,
+        max_new_tokens: int = _MAX_NEW_TOKENS,
+        use_caches: bool = True,
+    ) -> List[str]:
+        """
+        Runs the real model on a batch of requests in one `generate` call.
+
+        Args:
+            texts (List[str]): The prompts, one per request.
+            images (List[Union[Image.Image, bytes, np.ndarray, QwenImageInputs]]):
+                The images, in any form accepted by `get_decision`.
+            response_schema (Optional[Dict[str, Any]]): If given, decoding is
+                constrained so every response is valid JSON for the schema.
+            max_new_tokens (int): Upper bound on generated tokens per request.
+            use_caches (bool): If False, the vision-feature and prefix caches
+                are neither read nor filled.
+
+        Returns:
+            List[str]: The decoded responses, in request order.
+
+        Raises:
+            RuntimeError: If the model was deferred and is not loaded yet.
+        """
+        if self.model is None:
+            raise RuntimeError("LocalQwenVL: The model is not loaded yet; await `aload()` first.")
+        image_inputs = [image if isinstance(image, QwenImageInputs) else self.preprocess_image(image) for image in images]
+        prompts = [self._build_prompt(text, image_input) for text, image_input in zip(texts, image_inputs)]
+        tokens = self.processor.tokenizer(prompts, padding=True, return_tensors="pt")
+        inputs = self._to_device({
+            "input_ids": tokens["input_ids"],
+            "attention_mask": tokens["attention_mask"],
+            "pixel_values": torch.cat([image_input.pixel_values for image_input in image_inputs]),
+            "image_grid_thw": torch.cat([image_input.image_grid_thw for image_input in image_inputs]),
+        })
+        mm_hashes = [image_input.mm_hash for image_input in image_inputs]
+
+        generate_kwargs = {
+            "input_ids": inputs["input_ids"],
+            "attention_mask": inputs["attention_mask"],
+            "image_grid_thw": inputs["image_grid_thw"],
+            "max_new_tokens": max_new_tokens,
+            "do_sample": False,
+            "num_beams": 1,
+            "prefix_allowed_tokens_fn": self._schema_filter(response_schema),
+        }
+        with self._generate_lock, torch.inference_mode(), self._autocast():
+            prefix = None
+            if use_caches and len(texts) == 1 and self.prefix_cache is not None:
+                prefix = self._prefix_cache_for(inputs, mm_hashes[0])
+            if prefix is None:
+                output_ids = self.model.generate(inputs_embeds=self._inputs_embeds(inputs, mm_hashes, use_caches), **generate_kwargs)
+            else:
+                # The cache already holds the image, so only the text after
+                # it is prefilled, at positions shifted by the image's
+                # rope offset.
+                past_key_values, rope_deltas, prefix_length = prefix
+                self._set_rope_deltas(rope_deltas)
+                try:
+                    output_ids = self.model.generate(past_key_values=past_key_values, rope_deltas=rope_deltas, **generate_kwargs)
+                finally:
+                    # `generate` appended this request's tokens to the cache.
+                    past_key_values.crop(prefix_length)
+
+        # Keep only the newly generated tokens of each sequence.
+        generated_ids = output_ids[:, inputs["input_ids"].shape[1]:]
+        return [response.strip() for response in self.processor.batch_decode(generated_ids, skip_special_tokens=True)]
+
+    def _build_prompt(self, text: str, image_input: QwenImageInputs) -> str:
+        """
+        Renders the chat prompt for one request, with the image placeholder
+        expanded to one token per merged patch as the processor would do.
+        """
+        prompt = self.processor.apply_chat_template(
+            [{"role": "user", "content": [{"type": "image"}, {"type": "text", "text": text}]}],
+            tokenize=False,
+            add_generation_prompt=True,
+        )
+        image_token = getattr(self.processor, "image_token", "<|image_pad|>")
+        num_image_tokens = int(image_input.image_grid_thw.prod()) // self.processor.image_processor.merge_size ** 2
+        return prompt.replace(image_token, image_token * num_image_tokens, 1)
 
-    def get_decision(self, text: str, image: Image.Image) -> str:
+    def _inputs_embeds(self, inputs: Any, mm_hashes: List[str], use_cache: bool = True) -> Any:
         """
-        Simulates the decision-making process of a local VLM.
+        Builds the prompt embeddings with each image's vision features in
+        place of its image tokens.
 
-        This mock method prints the received inputs to simulate processing,
-        waits for a short period to mimic inference time, and then returns a
-        hardcoded, structured XML string as a dictionary.
+        This is what the model does itself when given `pixel_values`, except
+        that the features come from `_image_features`, so an image seen
+        before skips the vision tower.
+
+        Args:
+            inputs (Any): The model inputs, on device.
+            mm_hashes (List[str]): The content hash of each image, in order.
+            use_cache (bool): If False, the vision tower always runs and its
+                output is not cached.
+
+        Returns:
+            Any: A (batch, sequence, hidden) tensor for `inputs_embeds`.
+        """
+        input_ids = inputs["input_ids"]
+        grid_thw = inputs["image_grid_thw"]
+        features = []
+        offset = 0
+        for index, mm_hash in enumerate(mm_hashes):
+            # The processor concatenates every image's patches along dim 0.
+            rows = int(grid_thw[index].prod())
+            pixel_values = inputs["pixel_values"][offset:offset + rows]
+            if use_cache:
+                features.append(self._image_features(mm_hash, pixel_values, grid_thw[index:index + 1]))
+            else:
+                features.append(self._run_vision_tower(pixel_values, grid_thw[index:index + 1]))
+            offset += rows
+
+        embeds = self.model.get_input_embeddings()(input_ids)
+        image_mask = (input_ids == self.model.config.image_token_id).unsqueeze(-1).expand_as(embeds)
+        return embeds.masked_scatter(image_mask, torch.cat(features).to(embeds.dtype))
+
+    def _image_features(self, mm_hash: str, pixel_values: Any, grid_thw: Any) -> Any:
+        """
+        Returns the projected vision features of one image, using the cache.
+
+        Args:
+            mm_hash (str): The image's content hash (see `image_hash`).
+            pixel_values (Any): The image's patches from the processor.
+            grid_thw (Any): The image's (1, 3) patch grid.
+
+        Returns:
+            Any: A (tokens, hidden) tensor on the model's device.
+        """
+        features = self.vision_cache.get(mm_hash)
+        if features is not None:
+            logger.debug("LocalQwenVL: Reusing cached vision features for this image.")
+            return features
+        if self._embedding_store is not None and mm_hash in self._embedding_store:
+            logger.debug("LocalQwenVL: Loading precomputed vision features for this view.")
+            features = torch.from_numpy(self._embedding_store[mm_hash][()]).to(self.device, self.dtype)
+        else:
+            features = self._run_vision_tower(pixel_values, grid_thw)
+        self.vision_cache.put(mm_hash, features)
+        return features
+
+    def _vision_module(self) -> Any:
+        """
+        Returns the module that owns the model's vision tower.
+        """
+        # Newer transformers nest the vision module under `model.model`.
+        return self.model.model if hasattr(getattr(self.model, "model", None), "visual") else self.model
+
+    def _run_vision_tower(self, pixel_values: Any, grid_thw: Any) -> Any:
+        """
+        Runs the vision tower, including its patch merger (the projector into
+        the language model's embedding space), on one or more images.
+
+        Args:
+            pixel_values (Any): The images' patches from the processor.
+            grid_thw (Any): The images' patch grids, one row per image.
+
+        Returns:
+            Any: A (tokens, hidden) tensor on the model's device.
+        """
+        visual = self._vision_module().visual
+        with torch.inference_mode(), self._autocast():
+            return visual(pixel_values.to(self.device, getattr(visual, "dtype", self.dtype)), grid_thw=grid_thw.to(self.device))
+
+    def _autocast(self) -> Any:
+        """
+        Returns an autocast context in the model's dtype (a no-op on CPU).
+        """
+        return torch.autocast(self.device, dtype=self.dtype, enabled=self.device == "cuda")
+
+    def _prefix_cache_for(self, inputs: Any, mm_hash: str) -> Optional[Tuple[Any, Any, int]]:
+        """
+        Returns a KV cache covering the prompt up to the end of the image.
+
+        The chat template places the image before the user's text, so
+        clarification turns about the same frame share this prefix and only
+        their new text needs a prefill. On a miss the prefix is run once
+        through the model and its cache stored under the image's content
+        hash, together with the image's rope offset (`rope_deltas`), which
+        the model needs to position the remaining tokens. For a single
+        request the offset depends only on the image, not on the text.
+
+        The cached tensors are handed to `generate` as they are; the caller
+        holds `_generate_lock` and crops the cache back to the returned
+        prefix length afterwards.
+
+        Args:
+            inputs (Any): The model inputs of a single request, on device.
+            mm_hash (str): The content hash of the request's image.
+
+        Returns:
+            Optional[Tuple[Any, Any, int]]: The prefix cache, its rope
+                offset and its length in tokens, or None if the prompt
+                contains no image tokens.
+        """
+        input_ids = inputs["input_ids"]
+        image_positions = (input_ids[0] == self.model.config.image_token_id).nonzero()
+        if len(image_positions) == 0:
+            return None
+        prefix_length = int(image_positions[-1]) + 1
+
+        cached = self.prefix_cache.get(mm_hash)
+        if cached is not None:
+            logger.debug("LocalQwenVL: Reusing cached KV prefix for this image.")
+            return cached[0], cached[1], prefix_length
+
+        position_ids, rope_deltas = self._vision_module().get_rope_index(
+            input_ids,
+            image_grid_thw=inputs["image_grid_thw"],
+            attention_mask=inputs["attention_mask"],
+        )
+        # Passing a cache object makes every transformers version return
+        # one (rather than legacy tuples) that `crop` can trim.
+        past_key_values = DynamicCache()
+        self.model(
+            inputs_embeds=self._inputs_embeds(inputs, [mm_hash])[:, :prefix_length],
+            attention_mask=inputs["attention_mask"][:, :prefix_length],
+            position_ids=position_ids[..., :prefix_length],
+            past_key_values=past_key_values,
+            use_cache=True,
+        )
+        self.prefix_cache.put(mm_hash, (past_key_values, rope_deltas), nbytes=self._kv_cache_nbytes(past_key_values))
+        return past_key_values, rope_deltas, prefix_length
+
+    def _set_rope_deltas(self, rope_deltas: Any) -> None:
+        """
+        Sets the rope offset the model applies once a cache is in use.
+
+        Newer transformers keep it on the model (or its inner `model`)
+        instead of taking the `rope_deltas` argument of `generate`.
+        """
+        for module in (self.model, getattr(self.model, "model", None)):
+            if hasattr(module, "rope_deltas"):
+                module.rope_deltas = rope_deltas
+
+    @staticmethod
+    def _kv_cache_nbytes(kv_cache: Any) -> int:
+        """
+        Returns the memory held by a KV cache's key and value tensors.
+        """
+        layers = kv_cache.to_legacy_cache() if hasattr(kv_cache, "to_legacy_cache") else kv_cache
+        return sum(tensor.element_size() * tensor.nelement() for layer in layers for tensor in layer)
+
+    def _to_device(self, inputs: Any) -> Any:
+        """
+        Moves a dict of model inputs to the model's device.
+
+        On CUDA, tensors are copied into reusable pinned buffers and sent
+        with non-blocking copies on a dedicated stream, which the compute
+        stream then waits on; pageable tensors would force a synchronous
+        copy through a temporary pinned buffer on every call.
+        """
+        if self.device != "cuda":
+            return {name: tensor.to(self.device) for name, tensor in inputs.items()}
+        compute_stream = torch.cuda.current_stream()
+        with self._staging_lock:
+            slot = self._staging_slot
+            self._staging_slot = 1 - slot
+            # Wait until the last copy out of this slot has finished.
+            self._staging_events[slot].synchronize()
+            with torch.cuda.stream(self._copy_stream):
+                for name, tensor in inputs.items():
+                    if not isinstance(tensor, torch.Tensor):
+                        continue
+                    staged = self._staging_buffer(slot, name, tensor)
+                    staged.copy_(tensor)
+                    on_device = staged.to(self.device, non_blocking=True)
+                    # Allocated on the copy stream but used on the compute stream.
+                    on_device.record_stream(compute_stream)
+                    inputs[name] = on_device
+                self._staging_events[slot].record(self._copy_stream)
+        compute_stream.wait_stream(self._copy_stream)
+        return inputs
+
+    def _staging_buffer(self, slot: int, name: str, tensor: Any) -> Any:
+        """
+        Returns a pinned buffer shaped like `tensor`, growing the slot's
+        buffer for `name` when needed.
+        """
+        nbytes = tensor.numel() * tensor.element_size()
+        buffer = self._staging.get((slot, name))
+        if buffer is None or buffer.numel() < nbytes:
+            buffer = torch.empty(nbytes, dtype=torch.uint8, pin_memory=True)
+            self._staging[(slot, name)] = buffer
+        return buffer[:nbytes].view(tensor.dtype).view(tensor.shape)
+
+    def _schema_filter(self, response_schema: Optional[Dict[str, Any]]) -> Optional[Any]:
+        """
+        Returns the token filter enforcing `response_schema`, or None.
+
+        The filter's parser is built on first use of each schema and reused;
+        per step it only masks the tokens that would break the schema, so
+        the output never needs repair or a second forward pass.
+        """
+        if response_schema is None or JsonSchemaParser is None:
+            return None
+        key = json.dumps(response_schema, sort_keys=True)
+        token_filter = self._schema_filters.get(key)
+        if token_filter is None:
+            parser = JsonSchemaParser(self._to_json_schema(response_schema))
+            token_filter = build_transformers_prefix_allowed_tokens_fn(self.processor.tokenizer, parser)
+            self._schema_filters[key] = token_filter
+        return token_filter
+
+    @classmethod
+    def _to_json_schema(cls, schema: Any) -> Any:
+        """
+        Converts an OpenAPI-style response schema (upper-case types, as used
+        by Gemini) into standard JSON Schema.
+        """
+        if isinstance(schema, list):
+            return [cls._to_json_schema(item) for item in schema]
+        if not isinstance(schema, dict):
+            return schema
+        converted = {}
+        for key, value in schema.items():
+            if key == "type" and isinstance(value, str):
+                converted[key] = value.lower()
+            elif key == "format" and value == "enum":
+                continue
+            else:
+                converted[key] = cls._to_json_schema(value)
+        return converted
+
+    def _model_image(self, image: Union[Image.Image, bytes, np.ndarray]) -> Image.Image:
+        """
+        Returns the PIL image the processor sees for a request.
+
+        Its content hash keys the vision-feature cache and the embedding
+        store, so every path must prepare images the same way.
+        """
+        image = self._to_pil(image)
+        if self.vision_engine_path is not None:
+            image = image.resize((self.IMAGE_SIZE, self.IMAGE_SIZE), Image.Resampling.BICUBIC)
+        return image
+
+    @classmethod
+    def _to_pil(cls, image: Union[Image.Image, bytes, np.ndarray]) -> Image.Image:
+        """
+        Converts a PIL image, JPEG bytes or an (height, width, 3) uint8 RGB
+        frame into a prepared PIL image.
+        """
+        if isinstance(image, bytes):
+            image = Image.open(io.BytesIO(image))
+        elif isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        return prepare_image(image)
+
+    def preprocess_image(self, image: Union[Image.Image, bytes, np.ndarray]) -> Union[np.ndarray, QwenImageInputs]:
+        """
+        Converts an image into the model's image input, once.
+
+        With a real model, this runs the model's own image processor (which
+        chooses the resolution and patch grid) and hashes the result for the
+        vision-feature caches. The mock downsamples in uint8 first
+        (`prepare_image`), resizes to IMAGE_SIZE, and only then converts to
+        float and normalizes, so no full-resolution float copy is made.
+
+        Args:
+            image (Union[Image.Image, bytes, np.ndarray]): A PIL Image, JPEG
+                bytes, or an (height, width, 3) uint8 RGB frame.
+
+        Returns:
+            Union[np.ndarray, QwenImageInputs]: The processed image, accepted
+                by `get_decision` in place of the image: a `QwenImageInputs`
+                for the real model, or a read-only float32
+                (3, IMAGE_SIZE, IMAGE_SIZE) array for the mock.
+
+        Raises:
+            RuntimeError: If the real model was deferred and is not loaded yet.
+        """
+        if not self.use_mock:
+            if self.processor is None:
+                raise RuntimeError("LocalQwenVL: The model is not loaded yet; await `aload()` first.")
+            model_image = self._model_image(image)
+            pixels = self.processor.image_processor(images=[model_image], return_tensors="pt")
+            return QwenImageInputs(pixels["pixel_values"], pixels["image_grid_thw"], image_hash(model_image))
+
+        image = self._to_pil(image).resize((self.IMAGE_SIZE, self.IMAGE_SIZE), Image.Resampling.BICUBIC)
+        pixels = np.asarray(image, dtype=np.float32) / 255.0
+        pixels = ((pixels - self.IMAGE_MEAN) / self.IMAGE_STD).transpose(2, 0, 1)
+        pixels = np.ascontiguousarray(pixels)
+        pixels.setflags(write=False)
+        return pixels
+
+    def get_decision(self, text: str, image: Union[Image.Image, bytes, np.ndarray, QwenImageInputs], response_schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Gets a decision from the local VLM.
+
+        With a real model loaded, this runs `_generate` on the single request.
+        The mock logs the received inputs to simulate processing, waits for
+        a short period to mimic inference time, and then returns a hardcoded,
+        structured XML string.
 
         Args:
             text (str): The user's textual command.
-            image (Image.Image): A PIL Image object of the visual context.
+            image (Union[Image.Image, bytes, np.ndarray, QwenImageInputs]): The
+                visual context, as a PIL Image, as JPEG bytes, as an RGB frame
+                (real model), or as returned by `preprocess_image`.
+            response_schema (Optional[Dict[str, Any]]): If given, the real
+                model's output is constrained to this schema. Ignored by the mock.
 
         Returns:
-            str: A mock XML string representing a task plan.
+            str: The model's response (a mock XML plan in mock mode).
         """
-        print("LocalQwenVL: Simulating local VLM inference...")
-        print(f"LocalQwenVL: Received prompt: '{text}'")
-        print(f"LocalQwenVL: Received image of size: {image.size}")
+        if not self.use_mock:
+            return self._generate([text], [image], response_schema)[0]
+        self._preprocess(text, image)
 
         # Simulate the inference delay of a large local model.
-        time.sleep(2)
+        time.sleep(_MOCK_INFERENCE_SECONDS)
 
-        # Return a mock structured response for development and testing.
-        mock_response = """
-<plan>
-  <step>
-    <action>ASK_CLARIFICATION</action>
-    <target>您是指哪一個物件？</target>
-    <reason>This is a mock response from the local Qwen-VL model.</reason>
-  </step>
-</plan>
-"""
-        
-        print("LocalQwenVL: Mock inference complete.")
-        return mock_response.strip()
+        logger.debug("LocalQwenVL: Mock inference complete.")
+        return _MOCK_RESPONSE
+
+    async def aget_decision(self, text: str, image: Union[Image.Image, bytes, np.ndarray, QwenImageInputs], response_schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Asynchronous version of `get_decision` that never blocks the event loop.
+
+        The mock waits with `asyncio.sleep`, so concurrent calls (e.g., from an
+        async server) overlap instead of queuing behind one another. The real
+        model runs the blocking `model.generate` call with `asyncio.to_thread`.
+
+        Args:
+            text (str): The user's textual command.
+            image (Union[Image.Image, bytes, np.ndarray, QwenImageInputs]): The
+                visual context, as in `get_decision`.
+            response_schema (Optional[Dict[str, Any]]): If given, the real
+                model's output is constrained to this schema. Ignored by the mock.
+
+        Returns:
+            str: The model's response (a mock XML plan in mock mode).
+        """
+        if not self.use_mock:
+            return (await asyncio.to_thread(self._generate, [text], [image], response_schema))[0]
+        self._preprocess(text, image)
+        await asyncio.sleep(_MOCK_INFERENCE_SECONDS)
+        logger.debug("LocalQwenVL: Mock inference complete.")
+        return _MOCK_RESPONSE
+
+    def _preprocess(self, text: str, image: Union[Image.Image, bytes, np.ndarray]) -> None:
+        """
+        Logs a mock request's inputs. The mock never looks at the pixels, so
+        nothing is computed unless DEBUG logging is enabled.
+        """
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        logger.debug("LocalQwenVL: Simulating local VLM inference...")
+        logger.debug("LocalQwenVL: Received prompt: '%s'", text)
+        if isinstance(image, bytes):
+            logger.debug("LocalQwenVL: Received JPEG image of %d bytes", len(image))
+        elif isinstance(image, np.ndarray):
+            logger.debug("LocalQwenVL: Received image array of shape: %s", image.shape)
+        else:
+            logger.debug("LocalQwenVL: Received image of size: %s", image.size)
+
+    def get_decision_batch(self, texts: List[str], images: List[Union[Image.Image, bytes, np.ndarray, QwenImageInputs]], response_schema: Optional[Dict[str, Any]] = None) -> List[str]:
+        """
+        Runs a single batched forward pass over several requests.
+
+        The real model pads the prompts into one batch and calls
+        `model.generate` once (see `_generate`), so the GPU serves the whole
+        batch in roughly the time of one request. The mock reflects this by
+        sleeping once per batch.
+
+        Args:
+            texts (List[str]): The prompts, one per request.
+            images (List[Union[Image.Image, bytes, np.ndarray, QwenImageInputs]]):
+                The images, aligned with `texts`, in any form accepted by
+                `get_decision`.
+            response_schema (Optional[Dict[str, Any]]): If given, the real
+                model's output is constrained to this schema. Ignored by the mock.
+
+        Returns:
+            List[str]: One response per request (mock XML plans in mock mode).
+        """
+        if not self.use_mock:
+            return self._generate(texts, images, response_schema)
+        logger.debug("LocalQwenVL: Simulating batched inference for %d request(s)...", len(texts))
+        for text, image in zip(texts, images):
+            self._preprocess(text, image)
+        time.sleep(_MOCK_INFERENCE_SECONDS)
+        logger.debug("LocalQwenVL: Mock batched inference complete.")
+        return [_MOCK_RESPONSE for _ in texts]
+
+    def cache_embeddings(self, image_dir: str, h5_path: str, flush_every: int = 16) -> int:
+        """
+        Precomputes the real model's projected vision features for a set of
+        known views and stores them in an HDF5 file.
+
+        For a robot that revisits fixed workspace viewpoints, this is run once
+        over the stored views; at inference time a frame with the same content
+        is served from the file (see `load_embedding_store`) instead of
+        running the vision tower. Entries are keyed by `image_hash` of the
+        image as the processor sees it; views already in the file are
+        skipped. Features are stored as float32, since HDF5 has no bfloat16,
+        and the file records the model they were computed with.
+
+        Args:
+            image_dir (str): Directory containing one image file per view.
+            h5_path (str): The HDF5 file to create or extend.
+            flush_every (int): Number of new entries between flushes to disk.
+
+        Returns:
+            int: The number of views added to the file.
+
+        Raises:
+            ImportError: If h5py is not installed.
+            RuntimeError: If no real model is loaded.
+        """
+        if h5py is None:
+            raise ImportError("h5py is required for cache_embeddings. Install it with 'pip install h5py'.")
+        if self.model is None:
+            raise RuntimeError("LocalQwenVL: cache_embeddings needs the real model loaded.")
+
+        file_names = sorted(name for name in os.listdir(image_dir) if name.lower().endswith(_IMAGE_EXTENSIONS))
+        print(f"LocalQwenVL: Caching vision features for {len(file_names)} view(s) into '{h5_path}'...")
+        added = 0
+        with h5py.File(h5_path, "a") as store:
+            store.attrs["model_path"] = self.model_path
+            for file_name in file_names:
+                with Image.open(os.path.join(image_dir, file_name)) as view:
+                    image_input = self.preprocess_image(view)
+                if image_input.mm_hash in store:
+                    continue
+                features = self._run_vision_tower(image_input.pixel_values, image_input.image_grid_thw)
+                dataset = store.create_dataset(image_input.mm_hash, data=features.float().cpu().numpy(), chunks=True)
+                dataset.attrs["source"] = file_name
+                added += 1
+                if added % flush_every == 0:
+                    store.flush()
+        print(f"LocalQwenVL: Added {added} view(s) to the embedding store.")
+        return added
+
+    def load_embedding_store(self, h5_path: str) -> None:
+        """
+        Opens an HDF5 file written by `cache_embeddings` for lookups.
+
+        The file stays open read-only; features are read from disk only when
+        a frame matches a stored view and is not already in memory.
+
+        Args:
+            h5_path (str): The HDF5 file to open.
+
+        Raises:
+            ImportError: If h5py is not installed.
+        """
+        if h5py is None:
+            raise ImportError("h5py is required for the embedding store. Install it with 'pip install h5py'.")
+        if self._embedding_store is not None:
+            self._embedding_store.close()
+        self._embedding_store = h5py.File(h5_path, "r")
+        store_model = self._embedding_store.attrs.get("model_path")
+        if store_model is not None and store_model != self.model_path:
+            print(f"LocalQwenVL: Warning - embedding store was built with '{store_model}', not '{self.model_path}'.")
+        print(f"LocalQwenVL: Loaded embedding store with {len(self._embedding_store)} view(s).")
@@ -0,0 +1,131 @@
+# src/vlm/mm_cache.py
+"""
+Content-addressed cache of vision-encoder outputs for local VLMs.
+
+A local VLM spends much of each request running its vision tower over the
+image. Camera frames often repeat between turns (e.g., a clarification
+question about the same scene), so the encoder output is cached under a hash
+of the image content and reused on a hit, skipping the encoder entirely.
+
+Classes:
+    VisionEmbedCache: LRU cache of vision features bounded by total bytes
+
+Functions:
+    image_hash: Computes the content hash of an image
+"""
+
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+def image_hash(image: Union[Image.Image, bytes, np.ndarray]) -> str:
+    """
+    Computes a SHA-256 content hash of an image.
+
+    PIL images are hashed over their mode, size and raw pixel bytes, so two
+    frames with identical pixels share a hash. Arrays (e.g., preprocessed
+    model inputs) are hashed over their dtype, shape and data. Encoded bytes
+    are hashed as-is.
+
+    Args:
+        image (Union[Image.Image, bytes, np.ndarray]): The image, as a PIL
+            Image, an array, or encoded (e.g., JPEG) bytes.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    if isinstance(image, bytes):
+        digest.update(image)
+    elif isinstance(image, np.ndarray):
+        digest.update(f"{image.dtype}:{image.shape}".encode("utf-8"))
+        digest.update(np.ascontiguousarray(image).data)
+    else:
+        digest.update(f"{image.mode}:{image.size}".encode("utf-8"))
+        digest.update(image.tobytes())
+    return digest.hexdigest()
+
+def _nbytes(value: Any) -> int:
+    """
+    Returns the memory footprint of a cached value (tensor, array or other).
+    """
+    if hasattr(value, "element_size") and hasattr(value, "nelement"):
+        return value.element_size() * value.nelement()
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+class VisionEmbedCache:
+    """
+    A thread-safe LRU cache of vision features keyed by image hash.
+
+    The cache is bounded by the total size of the stored values rather than
+    their number, since feature tensors vary with image resolution. Values
+    are stored by reference; GPU tensors therefore stay on the GPU.
+    """
+
+    def __init__(self, capacity_bytes: int = 256 * 1024 * 1024) -> None:
+        """
+        Initializes an empty cache.
+
+        Args:
+            capacity_bytes (int): Total size of the stored values, in bytes,
+                                  above which the least recently used entries
+                                  are evicted. Defaults to 256 MiB.
+        """
+        self.capacity_bytes = capacity_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, mm_hash: str) -> Optional[Any]:
+        """
+        Returns the cached features for an image hash, or None on a miss.
+
+        Args:
+            mm_hash (str): The hash from `image_hash`.
+        """
+        with self._lock:
+            entry = self._entries.get(mm_hash)
+            if entry is None:
+                return None
+            self._entries.move_to_end(mm_hash)
+            return entry[0]
+
+    def put(self, mm_hash: str, features: Any, nbytes: Optional[int] = None) -> None:
+        """
+        Stores the features for an image hash, evicting the least recently
+        used entries while the cache is over capacity. Values larger than the
+        whole capacity are not stored.
+
+        Args:
+            mm_hash (str): The hash from `image_hash`.
+            features (Any): The vision-encoder output, typically a tensor.
+            nbytes (Optional[int]): The size of `features`. Computed from the
+                                    tensor or array if omitted.
+        """
+        size = _nbytes(features) if nbytes is None else nbytes
+        if size > self.capacity_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(mm_hash, None)
+            if previous is not None:
+                self._total_bytes -= previous[1]
+            self._entries[mm_hash] = (features, size)
+            self._total_bytes += size
+            while self._total_bytes > self.capacity_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+
+    def clear(self) -> None:
+        """
+        Drops all cached features.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
@@ -0,0 +1,168 @@
+# src/vlm/qwen_trt.py
+"""
+TensorRT acceleration of the Qwen-VL vision tower.
+
+The vision tower (ViT plus projector) sees fixed-size inputs on every
+request, which makes it a good fit for a prebuilt TensorRT engine. The
+engine is built once from an ONNX export of the vision tower at
+`LocalQwenVL.IMAGE_SIZE` and then swapped into the loaded model in place of
+its PyTorch vision module; the language model is left untouched.
+
+Classes:
+    TRTVisionTower: Drop-in replacement for the model's vision module
+
+Functions:
+    build_vision_engine: Builds a serialized engine from an ONNX file
+"""
+
+from typing import Any, Dict
+
+import torch
+
+try:
+    import tensorrt as trt
+except ImportError:
+    trt = None
+
+# Default builder workspace: enough for ViT-sized layers without starving
+# the language model that shares the GPU.
+_WORKSPACE_BYTES = 4 * 1024 ** 3
+
+def _require_tensorrt() -> None:
+    """
+    Raises ImportError if TensorRT is not installed.
+    """
+    if trt is None:
+        raise ImportError("tensorrt is required for the TensorRT vision engine. Install it with 'pip install tensorrt'.")
+
+def build_vision_engine(onnx_path: str, plan_path: str, bf16: bool = True, workspace_bytes: int = _WORKSPACE_BYTES) -> None:
+    """
+    Builds a TensorRT engine for the vision tower and writes it to disk.
+
+    The engine only accepts the input shape of the ONNX export, so the
+    export should use the pixel layout produced for one `IMAGE_SIZE` image.
+
+    Args:
+        onnx_path (str): The ONNX export of the vision tower.
+        plan_path (str): Where to write the serialized engine.
+        bf16 (bool): Build with bfloat16 kernels (Ampere GPUs and newer).
+                     If False, float16 is used instead.
+        workspace_bytes (int): Scratch memory the builder may use.
+
+    Raises:
+        ImportError: If TensorRT is not installed.
+        RuntimeError: If the ONNX file cannot be parsed or the build fails.
+    """
+    _require_tensorrt()
+    logger = trt.Logger(trt.Logger.WARNING)
+    builder = trt.Builder(logger)
+    network = builder.create_network(0)
+    parser = trt.OnnxParser(network, logger)
+    with open(onnx_path, "rb") as f:
+        if not parser.parse(f.read()):
+            errors = "; ".join(str(parser.get_error(i)) for i in range(parser.num_errors))
+            raise RuntimeError(f"Failed to parse ONNX model '{onnx_path}': {errors}")
+
+    config = builder.create_builder_config()
+    config.set_memory_pool_limit(trt.MemoryPoolType.WORKSPACE, workspace_bytes)
+    config.set_flag(trt.BuilderFlag.BF16 if bf16 else trt.BuilderFlag.FP16)
+
+    print(f"qwen_trt: Building vision engine from '{onnx_path}' (this can take several minutes)...")
+    serialized = builder.build_serialized_network(network, config)
+    if serialized is None:
+        raise RuntimeError(f"TensorRT failed to build an engine from '{onnx_path}'.")
+    with open(plan_path, "wb") as f:
+        f.write(serialized)
+    print(f"qwen_trt: Vision engine written to '{plan_path}'.")
+
+def _torch_dtype(trt_dtype: Any) -> torch.dtype:
+    """
+    Maps a TensorRT data type to the matching torch dtype.
+    """
+    mapping: Dict[Any, torch.dtype] = {
+        trt.float32: torch.float32,
+        trt.float16: torch.float16,
+        trt.bfloat16: torch.bfloat16,
+        trt.int32: torch.int32,
+    }
+    return mapping[trt_dtype]
+
+class TRTVisionTower(torch.nn.Module):
+    """
+    Runs the vision tower from a prebuilt TensorRT engine.
+
+    Input and output buffers are allocated once on the GPU and bound to the
+    execution context, so each call is a copy in, one `execute_async_v3` on
+    the current CUDA stream, and a copy out. Inputs holding several images'
+    worth of rows (a batch) are run one engine-sized chunk at a time.
+    """
+
+    def __init__(self, plan_path: str, device: str = "cuda") -> None:
+        """
+        Loads a serialized engine and allocates its buffers.
+
+        Args:
+            plan_path (str): An engine written by `build_vision_engine`.
+            device (str): The CUDA device to run on.
+
+        Raises:
+            ImportError: If TensorRT is not installed.
+        """
+        super().__init__()
+        _require_tensorrt()
+        runtime = trt.Runtime(trt.Logger(trt.Logger.WARNING))
+        with open(plan_path, "rb") as f:
+            self.engine = runtime.deserialize_cuda_engine(f.read())
+        self.context = self.engine.create_execution_context()
+
+        names = [self.engine.get_tensor_name(i) for i in range(self.engine.num_io_tensors)]
+        input_name = next(name for name in names if self.engine.get_tensor_mode(name) == trt.TensorIOMode.INPUT)
+        output_name = next(name for name in names if self.engine.get_tensor_mode(name) == trt.TensorIOMode.OUTPUT)
+
+        self._input = torch.empty(
+            tuple(self.engine.get_tensor_shape(input_name)),
+            dtype=_torch_dtype(self.engine.get_tensor_dtype(input_name)),
+            device=device,
+        )
+        self._output = torch.empty(
+            tuple(self.engine.get_tensor_shape(output_name)),
+            dtype=_torch_dtype(self.engine.get_tensor_dtype(output_name)),
+            device=device,
+        )
+        self.context.set_tensor_address(input_name, self._input.data_ptr())
+        self.context.set_tensor_address(output_name, self._output.data_ptr())
+        # The model casts pixel values to its vision module's dtype.
+        self.dtype = self._input.dtype
+        print(f"qwen_trt: Loaded vision engine '{plan_path}' (input {tuple(self._input.shape)}).")
+
+    @torch.compiler.disable
+    def forward(self, pixel_values: torch.Tensor, *args: Any, **kwargs: Any) -> torch.Tensor:
+        """
+        Encodes pixel values with the engine.
+
+        Extra arguments of the PyTorch vision module (e.g., `grid_thw`) are
+        accepted and ignored, since the engine's shapes are fixed.
+
+        Args:
+            pixel_values (torch.Tensor): The processor's pixel values, whose
+                first dimension is a multiple of the engine's.
+
+        Returns:
+            torch.Tensor: The vision features, one chunk per image, concatenated.
+
+        Raises:
+            ValueError: If the input does not split into engine-sized chunks.
+        """
+        rows = self._input.shape[0]
+        if pixel_values.shape[1:] != self._input.shape[1:] or pixel_values.shape[0] % rows:
+            raise ValueError(
+                f"TRTVisionTower: Input of shape {tuple(pixel_values.shape)} does not match "
+                f"the engine input {tuple(self._input.shape)}; resize images to the export size."
+            )
+        stream = torch.cuda.current_stream(self._input.device)
+        outputs = []
+        for chunk in pixel_values.split(rows):
+            self._input.copy_(chunk)
+            self.context.execute_async_v3(stream.cuda_stream)
+            outputs.append(self._output.clone())
+        return torch.cat(outputs)
@@ -0,0 +1,100 @@
+# src/vlm/routing_vlm.py
+from PIL import Image
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .vlm_interface import VLMInterface
+
+class RoutingVLM(VLMInterface):
+    """
+    Routes each request to a small, fast VLM or a large, accurate one.
+
+    Many requests (e.g., "which object do you mean?" clarifications) are
+    answered just as well by a small model. A router scores every request
+    with the probability that it needs the large model; requests scoring
+    above `threshold` go to `big`, the rest to `small`. Average latency then
+    approaches the small model's while hard requests keep the large model.
+
+    The router is any callable, from a keyword heuristic to a trained
+    classifier. It runs on the caller's thread before dispatch, so it should
+    be much cheaper than the small model.
+    """
+
+    def __init__(
+        self,
+        small: VLMInterface,
+        big: VLMInterface,
+        router: Callable[[str, Union[Image.Image, bytes]], float],
+        threshold: float = 0.5,
+    ) -> None:
+        """
+        Initializes the router.
+
+        Args:
+            small (VLMInterface): The service for easy requests.
+            big (VLMInterface): The service for hard requests.
+            router (Callable[[str, Union[Image.Image, bytes]], float]): Returns
+                a score in [0, 1] for a (text, image) request; higher means
+                the request needs the large model.
+            threshold (float): Scores above this value are sent to `big`.
+        """
+        self.small = small
+        self.big = big
+        self.router = router
+        self.threshold = threshold
+
+    def _route(self, text: str, image: Union[Image.Image, bytes]) -> VLMInterface:
+        """
+        Returns the service that should answer a request.
+        """
+        return self.big if self.router(text, image) > self.threshold else self.small
+
+    def get_decision(self, text: str, image: Union[Image.Image, bytes], response_schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Sends the request to the service chosen by the router.
+        See `VLMInterface.get_decision`.
+        """
+        return self._route(text, image).get_decision(text, image, response_schema=response_schema)
+
+    async def aget_decision(self, text: str, image: Union[Image.Image, bytes], response_schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Awaits the service chosen by the router. See `VLMInterface.aget_decision`.
+        """
+        return await self._route(text, image).aget_decision(text, image, response_schema=response_schema)
+
+    def get_decision_batch(self, texts: List[str], images: List[Union[Image.Image, bytes]], response_schema: Optional[Dict[str, Any]] = None) -> List[str]:
+        """
+        Splits the batch by route and sends one sub-batch to each service.
+
+        Returns:
+            List[str]: The responses, in the same order as the requests.
+
+        Raises:
+            RuntimeError: If a service returns the wrong number of responses.
+        """
+        small_indices: List[int] = []
+        big_indices: List[int] = []
+        for index, (text, image) in enumerate(zip(texts, images)):
+            # Compared by identity: `small` and `big` may be equal but distinct.
+            (big_indices if self._route(text, image) is self.big else small_indices).append(index)
+
+        responses: List[Optional[str]] = [None] * len(texts)
+        for service, indices in ((self.small, small_indices), (self.big, big_indices)):
+            if not indices:
+                continue
+            batch = service.get_decision_batch(
+                [texts[i] for i in indices],
+                [images[i] for i in indices],
+                response_schema=response_schema,
+            )
+            if len(batch) != len(indices):
+                raise RuntimeError(f"Expected {len(indices)} responses from {type(service).__name__}, got {len(batch)}.")
+            for i, response in zip(indices, batch):
+                responses[i] = response
+        return responses
+
+    def warm_up(self) -> None:
+        """
+        Warms up both services.
+        """
+        self.small.warm_up()
+        self.big.warm_up()
@@ -1,6 +1,31 @@
 # src/vlm/vlm_interface.py
+import asyncio
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from PIL import Image
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# `get_decision_within` runs requests on one shared event loop, whose default
+# executor (used by `aget_decision`'s worker-thread fallback) is capped at this
+# many threads, so requests that keep running after a timeout cannot pile up.
+_MAX_BLOCKING_REQUESTS = 4
+
+_request_loop: Optional[asyncio.AbstractEventLoop] = None
+_request_loop_lock = threading.Lock()
+
+def _get_request_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the shared event loop for timed requests, starting it on first use.
+    """
+    global _request_loop
+    with _request_loop_lock:
+        if _request_loop is None:
+            loop = asyncio.new_event_loop()
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=_MAX_BLOCKING_REQUESTS, thread_name_prefix="vlm-request"))
+            threading.Thread(target=loop.run_forever, name="vlm-request-loop", daemon=True).start()
+            _request_loop = loop
+        return _request_loop
 
 class VLMInterface(ABC):
     """
@@ -15,7 +40,7 @@ class VLMInterface(ABC):
     """
 
     @abstractmethod
-    def get_decision(self, text: str, image: Image.Image) -> str:
+    def get_decision(self, text: str, image: Union[Image.Image, bytes], response_schema: Optional[Dict[str, Any]] = None) -> str:
         """
         Processes a text prompt and an image to generate a decision.
 
@@ -25,8 +50,18 @@ class VLMInterface(ABC):
 
         Args:
             text (str): The textual instruction or query from the user.
-            image (Image.Image): A PIL Image object representing the current
-                                 visual scene (e.g., a live camera frame).
+            image (Union[Image.Image, bytes]): The current visual scene (e.g., a
+                                 live camera frame), either as a PIL Image or
+                                 as JPEG-encoded bytes (see `encode_jpeg`).
+                                 Implementations should pass PIL images
+                                 through `prepare_image` before any further
+                                 preprocessing, so resizing happens on uint8
+                                 pixels rather than on tensors.
+            response_schema (Optional[Dict[str, Any]]): An optional JSON schema
+                                 (OpenAPI subset) for the response. Services
+                                 that support constrained output must then
+                                 return a bare JSON document matching it;
+                                 others may ignore it.
 
         Returns:
             str: A string containing the model's response, which is expected
@@ -37,3 +72,108 @@ class VLMInterface(ABC):
                        process, such as API connection failures or model errors.
         """
         pass
+
+    async def aget_decision(self, text: str, image: Union[Image.Image, bytes], response_schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Asynchronous version of `get_decision`.
+
+        The default implementation runs `get_decision` in a worker thread so
+        it does not block the event loop. Services with a native async client
+        should override it.
+
+        Args:
+            text (str): The textual instruction or query from the user.
+            image (Union[Image.Image, bytes]): The current visual scene.
+            response_schema (Optional[Dict[str, Any]]): As in `get_decision`.
+
+        Returns:
+            str: The model's response, as from `get_decision`.
+        """
+        return await asyncio.to_thread(self.get_decision, text, image, response_schema)
+
+    def get_decision_within(self, text: str, image: Union[Image.Image, bytes], timeout: float, response_schema: Optional[Dict[str, Any]] = None) -> Tuple[str, bool]:
+        """
+        Gets a decision, giving up after `timeout` seconds.
+
+        The request runs as `aget_decision` on a shared background event
+        loop, so a stuck inference never blocks the caller (e.g., the
+        robot's control loop) for longer than the timeout. On timeout the
+        request is cancelled: services with a native async client stop it,
+        while a blocking `get_decision` finishes on one of the loop's
+        `_MAX_BLOCKING_REQUESTS` worker threads and its result is discarded.
+
+        Args:
+            text (str): The textual instruction or query from the user.
+            image (Union[Image.Image, bytes]): The current visual scene.
+            timeout (float): Longest time to wait, in seconds.
+            response_schema (Optional[Dict[str, Any]]): As in `get_decision`.
+
+        Returns:
+            Tuple[str, bool]: The response and True, or an empty string and
+                              False if no response arrived in time. Callers
+                              should skip acting on the decision when the
+                              flag is False.
+
+        Raises:
+            Exception: Any error raised by `aget_decision` within the timeout.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self.aget_decision(text, image, response_schema=response_schema),
+            _get_request_loop(),
+        )
+        try:
+            return future.result(timeout=timeout), True
+        except FutureTimeoutError:
+            future.cancel()
+            print(f"{type(self).__name__}: No decision within {timeout:.1f}s; skipping this request.")
+            return "", False
+
+    async def aget_decision_within(self, text: str, image: Union[Image.Image, bytes], timeout: float, response_schema: Optional[Dict[str, Any]] = None) -> Tuple[str, bool]:
+        """
+        Asynchronous version of `get_decision_within`, built on `aget_decision`.
+
+        On timeout the pending `aget_decision` is cancelled; work already
+        handed to a worker thread finishes in the background.
+
+        Returns:
+            Tuple[str, bool]: As in `get_decision_within`.
+        """
+        try:
+            return await asyncio.wait_for(self.aget_decision(text, image, response_schema=response_schema), timeout), True
+        except asyncio.TimeoutError:
+            print(f"{type(self).__name__}: No decision within {timeout:.1f}s; skipping this request.")
+            return "", False
+
+    def get_decision_batch(self, texts: List[str], images: List[Union[Image.Image, bytes]], response_schema: Optional[Dict[str, Any]] = None) -> List[str]:
+        """
+        Processes several independent (text, image) requests.
+
+        The default implementation calls `get_decision` for each request in
+        turn. Services that can serve requests concurrently or in a single
+        call should override it; for a local model this means one padded
+        forward pass (`model.generate`) over the whole batch, which keeps the
+        GPU busy instead of running one batch-size-1 pass per request.
+
+        Args:
+            texts (List[str]): The prompts, one per request.
+            images (List[Union[Image.Image, bytes]]): The images, aligned with `texts`.
+            response_schema (Optional[Dict[str, Any]]): Applied to every request,
+                                 as in `get_decision`.
+
+        Returns:
+            List[str]: The responses, in the same order as the requests.
+
+        Raises:
+            Exception: If any request fails.
+        """
+        return [self.get_decision(text, image, response_schema=response_schema) for text, image in zip(texts, images)]
+
+    def warm_up(self) -> None:
+        """
+        Issues a minimal request so the first real decision is not slowed down
+        by one-time costs (e.g., connection setup, CUDA kernel selection).
+
+        The default implementation does nothing; services with a noticeable
+        cold-start cost should override it.
+        """
+        pass